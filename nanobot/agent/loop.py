@@ -3,7 +3,7 @@
 import asyncio
 import json
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
@@ -21,6 +21,9 @@ from nanobot.agent.tools.cron import CronTool
 from nanobot.agent.subagent import SubagentManager
 from nanobot.session.manager import SessionManager
 
+if TYPE_CHECKING:
+    from nanobot.config.schema import SubagentConfig
+
 
 class AgentLoop:
     """
@@ -45,6 +48,7 @@ class AgentLoop:
         exec_config: "ExecToolConfig | None" = None,
         cron_service: "CronService | None" = None,
         restrict_to_workspace: bool = False,
+        subagent_config: "SubagentConfig | None" = None,
     ):
         from nanobot.config.schema import ExecToolConfig
         from nanobot.cron.service import CronService
@@ -69,6 +73,7 @@ class AgentLoop:
             brave_api_key=brave_api_key,
             exec_config=self.exec_config,
             restrict_to_workspace=restrict_to_workspace,
+            subagent_config=subagent_config,
         )
         
         self._running = False
@@ -138,6 +143,7 @@ class AgentLoop:
     def stop(self) -> None:
         """停止代理循环。"""
         self._running = False
+        self.sessions.flush()
         logger.info("Agent 循环正在停止")
     
     async def _process_message(self, msg: InboundMessage) -> OutboundMessage | None:
@@ -216,8 +222,10 @@ class AgentLoop:
                 
                 # Execute tools
                 for tool_call in response.tool_calls:
-                    args_str = json.dumps(tool_call.arguments)
-                    logger.debug(f"Executing tool: {tool_call.name} with arguments: {args_str}")
+                    logger.opt(lazy=True).debug(
+                        "Executing tool: {} with arguments: {}",
+                        lambda: tool_call.name, lambda: json.dumps(tool_call.arguments),
+                    )
                     result = await self.tools.execute(tool_call.name, tool_call.arguments)
                     messages = self.context.add_tool_result(
                         messages, tool_call.id, tool_call.name, result
@@ -315,8 +323,10 @@ class AgentLoop:
                 )
                 
                 for tool_call in response.tool_calls:
-                    args_str = json.dumps(tool_call.arguments)
-                    logger.debug(f"Executing tool: {tool_call.name} with arguments: {args_str}")
+                    logger.opt(lazy=True).debug(
+                        "Executing tool: {} with arguments: {}",
+                        lambda: tool_call.name, lambda: json.dumps(tool_call.arguments),
+                    )
                     result = await self.tools.execute(tool_call.name, tool_call.arguments)
                     messages = self.context.add_tool_result(
                         messages, tool_call.id, tool_call.name, result
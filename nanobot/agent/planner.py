@@ -0,0 +1,180 @@
+"""子代理任务的 JIT 规划器：用一次 LLM 调用生成静态的工具执行图。"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+import orjson
+from loguru import logger
+
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.providers.base import LLMProvider
+
+PLANNER_PROMPT = """你是一个任务规划器。根据任务和可用工具，输出一个可以直接执行的工具调用计划。
+
+## 可用工具
+{tools}
+
+## 输出格式
+只输出 JSON，不要输出其他内容：
+{{"steps": [{{"tool": "工具名称", "args": {{...}}, "depends_on": [前置步骤的下标]}}]}}
+
+## 规则
+1. 只包含参数在规划时就能完全确定的步骤
+2. 如果某步骤的参数依赖前面步骤的输出，不要包含它
+3. depends_on 中填写必须先完成的步骤下标（从 0 开始）
+4. 如果任务无法预先规划，输出 {{"steps": []}}"""
+
+
+@dataclass
+class PlanStep:
+    """计划中的单个工具调用。"""
+    tool: str
+    args: dict[str, Any]
+    depends_on: list[int] = field(default_factory=list)
+
+
+class JITPlanner:
+    """
+    将子代理任务"编译"为静态的工具执行图。
+
+    规划器用一次 LLM 调用生成计划，校验后按依赖关系分层，
+    同一层的步骤可以并行执行，从而用一次规划调用替代多轮 LLM 往返。
+    编译结果按任务和工具集缓存，重复任务可完全跳过规划调用。
+    规划或校验失败时返回 None，调用方应回退到常规代理循环。
+    """
+
+    def __init__(self, provider: LLMProvider, model: str, cache_size: int = 64):
+        self.provider = provider
+        self.model = model
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, list[list[PlanStep]]] = OrderedDict()
+
+    async def plan(self, task: str, tools: ToolRegistry) -> list[list[PlanStep]] | None:
+        """
+        为任务生成分层执行计划。
+
+        参数:
+            task: 任务描述。
+            tools: 计划可使用的工具注册表。
+
+        返回:
+            按执行顺序排列的步骤层列表；无法规划时返回 None。
+        """
+        key = self._cache_key(task, tools)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        prompt = PLANNER_PROMPT.format(
+            tools=json.dumps(tools.get_definitions(), ensure_ascii=False)
+        )
+        try:
+            response = await self.provider.chat(
+                messages=[
+                    {"role": "system", "content": prompt},
+                    {"role": "user", "content": task},
+                ],
+                model=self.model,
+            )
+        except Exception as e:
+            logger.warning(f"任务规划失败：{e}")
+            return None
+
+        levels = self._compile(response.content or "", tools)
+        if levels is None:
+            return None
+
+        self._cache[key] = levels
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return levels
+
+    async def execute(
+        self,
+        levels: list[list[PlanStep]],
+        tools: ToolRegistry,
+    ) -> list[tuple[PlanStep, str]]:
+        """逐层执行计划，返回 (步骤, 结果) 列表。"""
+        executed: list[tuple[PlanStep, str]] = []
+        for level in levels:
+            results = await tools.execute_many([(step.tool, step.args) for step in level])
+            executed.extend(zip(level, results))
+        return executed
+
+    @staticmethod
+    def to_messages(executed: list[tuple[PlanStep, str]]) -> list[dict[str, Any]]:
+        """将执行结果转换为助手工具调用消息和工具结果消息。"""
+        if not executed:
+            return []
+        tool_calls = []
+        results = []
+        for i, (step, result) in enumerate(executed):
+            call_id = f"plan_{i}"
+            tool_calls.append({
+                "id": call_id,
+                "type": "function",
+                "function": {
+                    "name": step.tool,
+                    "arguments": orjson.dumps(step.args).decode(),
+                },
+            })
+            results.append({
+                "role": "tool",
+                "tool_call_id": call_id,
+                "name": step.tool,
+                "content": result,
+            })
+        return [{"role": "assistant", "content": "", "tool_calls": tool_calls}, *results]
+
+    def _cache_key(self, task: str, tools: ToolRegistry) -> str:
+        tool_set = ",".join(sorted(tools.tool_names))
+        return hashlib.sha1(f"{tool_set}\n{task}".encode("utf-8")).hexdigest()
+
+    def _compile(self, content: str, tools: ToolRegistry) -> list[list[PlanStep]] | None:
+        """解析并校验计划，然后按依赖关系拓扑分层。"""
+        start, end = content.find("{"), content.rfind("}")
+        if start == -1 or end <= start:
+            return None
+        try:
+            raw_steps = json.loads(content[start:end + 1]).get("steps", [])
+        except (json.JSONDecodeError, AttributeError):
+            return None
+        if not isinstance(raw_steps, list):
+            return None
+
+        steps: list[PlanStep] = []
+        for i, raw in enumerate(raw_steps):
+            if not isinstance(raw, dict):
+                return None
+            name = raw.get("tool")
+            args = raw.get("args") or {}
+            depends_on = raw.get("depends_on") or []
+            tool = tools.get(name) if isinstance(name, str) else None
+            if tool is None or not isinstance(args, dict) or not isinstance(depends_on, list):
+                logger.debug(f"计划步骤 {i} 无效：{raw}")
+                return None
+            if any(not isinstance(d, int) or not 0 <= d < len(raw_steps) or d == i for d in depends_on):
+                logger.debug(f"计划步骤 {i} 的依赖无效：{depends_on}")
+                return None
+            if errors := tool.validate_params(args):
+                logger.debug(f"计划步骤 {i} 参数无效：{'；'.join(errors)}")
+                return None
+            steps.append(PlanStep(tool=name, args=args, depends_on=depends_on))
+
+        # Kahn 拓扑排序：每一层只依赖之前的层
+        levels: list[list[PlanStep]] = []
+        done: set[int] = set()
+        pending = list(range(len(steps)))
+        while pending:
+            ready = [i for i in pending if all(d in done for d in steps[i].depends_on)]
+            if not ready:
+                logger.debug("计划中存在循环依赖")
+                return None
+            levels.append([steps[i] for i in ready])
+            done.update(ready)
+            pending = [i for i in pending if i not in done]
+        return levels
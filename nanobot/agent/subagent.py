@@ -1,21 +1,84 @@
 """用于后台任务执行的子代理管理器。"""
 
 import asyncio
-import json
 import uuid
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Literal
 
+import orjson
 from loguru import logger
 
 from nanobot.bus.events import InboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.providers.base import LLMProvider
+from nanobot.agent.planner import JITPlanner
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, ListDirTool
 from nanobot.agent.tools.shell import ExecTool
 from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
 
+if TYPE_CHECKING:
+    from nanobot.config.schema import SubagentConfig
+
+# 子代理系统提示词模板：{WORKSPACE} 在初始化时替换，{TASK} 在每次生成时替换
+SUBAGENT_PROMPT_TEMPLATE = """# 子代理
+
+你是由主代理生成来完成特定任务的子代理。
+
+## 你的任务
+{TASK}
+
+## 规则
+1. 保持专注 - 只完成分配的任务，不做其他事情
+2. 你的最终响应将报告回主代理
+3. 不要发起对话或承担旁支任务
+4. 在你的发现中要简洁但信息丰富
+
+## 你能做什么
+- 在工作区中读写文件
+- 执行 shell 命令
+- 搜索网页并获取网页内容
+- 彻底完成任务
+
+## 你不能做什么
+- 直接向用户发送消息（无消息工具可用）
+- 生成其他子代理
+- 访问主代理的对话历史
+
+## 工作区
+你的工作区位于：{WORKSPACE}
+
+当你完成任务时，提供你的发现或行动的清晰总结。"""
+
+# 上下文压缩：消息总字符数超过阈值时，截断除最近几条之外的工具结果
+COMPACT_THRESHOLD_CHARS = 50_000
+COMPACT_KEEP_RECENT = 2
+COMPACT_TRUNCATE_CHARS = 500
+# 紧跟在截断内容之后的压缩标记，用于识别已压缩过的工具结果
+_COMPACT_MARKER = "\n...（已压缩，省略 "
+
+
+def _compact_tool_results(messages: list[dict[str, Any]]) -> None:
+    """
+    就地截断较早的工具结果以控制每轮发送给 LLM 的上下文大小。
+    
+    只截断内容而不删除消息，保证每个工具调用 ID 仍有对应的工具结果。
+    """
+    total = sum(len(m.get("content") or "") for m in messages)
+    if total <= COMPACT_THRESHOLD_CHARS:
+        return
+    tool_messages = [m for m in messages if m["role"] == "tool"]
+    for m in tool_messages[:-COMPACT_KEEP_RECENT]:
+        content = m["content"]
+        # 已压缩过的结果不再重复截断，否则省略的字符数会被错误覆盖
+        if len(content) > COMPACT_TRUNCATE_CHARS and not content.startswith(
+            _COMPACT_MARKER, COMPACT_TRUNCATE_CHARS
+        ):
+            m["content"] = (
+                content[:COMPACT_TRUNCATE_CHARS]
+                + f"{_COMPACT_MARKER}{len(content) - COMPACT_TRUNCATE_CHARS} 个字符）"
+            )
+
 
 class SubagentManager:
     """
@@ -34,8 +97,9 @@ class SubagentManager:
         brave_api_key: str | None = None,
         exec_config: "ExecToolConfig | None" = None,
         restrict_to_workspace: bool = False,
+        subagent_config: "SubagentConfig | None" = None,
     ):
-        from nanobot.config.schema import ExecToolConfig
+        from nanobot.config.schema import ExecToolConfig, SubagentConfig
         self.provider = provider
         self.workspace = workspace
         self.bus = bus
@@ -43,7 +107,36 @@ class SubagentManager:
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
         self.restrict_to_workspace = restrict_to_workspace
+        self.config = subagent_config or SubagentConfig()
+        self.planner = JITPlanner(provider, self.model) if self.config.jit_planning else None
         self._running_tasks: dict[str, asyncio.Task[None]] = {}
+        self._task_status: dict[str, Literal["queued", "running"]] = {}
+        self._semaphore = asyncio.Semaphore(max(1, self.config.max_concurrency))
+        # 按 "channel:chat_id" 合并短时间内完成的子代理通知
+        self._pending_announcements: dict[str, list[str]] = {}
+        self._flush_tasks: dict[str, asyncio.Task[None]] = {}
+        self._tools = self._build_tools()
+        self._prompt_template = SUBAGENT_PROMPT_TEMPLATE.replace("{WORKSPACE}", str(workspace))
+    
+    def _build_tools(self) -> ToolRegistry:
+        """
+        构建所有子代理共享的工具注册表（无消息工具，无生成工具）。
+        
+        这些工具除构造参数外不持有状态，子代理特定的上下文保存在各自的消息中。
+        """
+        tools = ToolRegistry()
+        allowed_dir = self.workspace if self.restrict_to_workspace else None
+        tools.register(ReadFileTool(allowed_dir=allowed_dir))
+        tools.register(WriteFileTool(allowed_dir=allowed_dir))
+        tools.register(ListDirTool(allowed_dir=allowed_dir))
+        tools.register(ExecTool(
+            working_dir=str(self.workspace),
+            timeout=self.exec_config.timeout,
+            restrict_to_workspace=self.restrict_to_workspace,
+        ))
+        tools.register(WebSearchTool(api_key=self.brave_api_key))
+        tools.register(WebFetchTool())
+        return tools
     
     async def spawn(
         self,
@@ -72,18 +165,36 @@ class SubagentManager:
             "chat_id": origin_chat_id,
         }
         
-        # 创建后台任务
+        # 创建后台任务（超过并发上限时排队）
+        self._task_status[task_id] = "queued"
         bg_task = asyncio.create_task(
-            self._run_subagent(task_id, task, display_label, origin)
+            self._run_queued(task_id, task, display_label, origin)
         )
         self._running_tasks[task_id] = bg_task
         
         # 完成时清理
-        bg_task.add_done_callback(lambda _: self._running_tasks.pop(task_id, None))
+        def _cleanup(_: asyncio.Task[None]) -> None:
+            self._running_tasks.pop(task_id, None)
+            self._task_status.pop(task_id, None)
+        bg_task.add_done_callback(_cleanup)
         
         logger.info(f"生成子代理 [{task_id}]：{display_label}")
         return f"子代理 [{display_label}] 已启动（id：{task_id}）。完成后我会通知你。"
     
+    async def _run_queued(
+        self,
+        task_id: str,
+        task: str,
+        label: str,
+        origin: dict[str, str],
+    ) -> None:
+        """等待并发名额后执行子代理。"""
+        async with self._semaphore:
+            self._task_status[task_id] = "running"
+            # 首个子代理启动时预热提供商连接池，之后的调用立即返回
+            await self.provider.warmup()
+            await self._run_subagent(task_id, task, label, origin)
+    
     async def _run_subagent(
         self,
         task_id: str,
@@ -95,19 +206,7 @@ class SubagentManager:
         logger.info(f"子代理 [{task_id}] 开始任务：{label}")
         
         try:
-            # 构建子代理工具（无消息工具，无生成工具）
-            tools = ToolRegistry()
-            allowed_dir = self.workspace if self.restrict_to_workspace else None
-            tools.register(ReadFileTool(allowed_dir=allowed_dir))
-            tools.register(WriteFileTool(allowed_dir=allowed_dir))
-            tools.register(ListDirTool(allowed_dir=allowed_dir))
-            tools.register(ExecTool(
-                working_dir=str(self.workspace),
-                timeout=self.exec_config.timeout,
-                restrict_to_workspace=self.restrict_to_workspace,
-            ))
-            tools.register(WebSearchTool(api_key=self.brave_api_key))
-            tools.register(WebFetchTool())
+            tools = self._tools
             
             # 使用子代理特定提示词构建消息
             system_prompt = self._build_subagent_prompt(task)
@@ -116,6 +215,17 @@ class SubagentManager:
                 {"role": "user", "content": task},
             ]
             
+            # JIT 规划：一次规划调用直接执行可预先确定的工具步骤，
+            # 结果作为工具消息注入，剩余工作交给常规循环完成
+            if self.planner:
+                plan = await self.planner.plan(task, tools)
+                if plan:
+                    logger.opt(lazy=True).debug(
+                        "子代理 [{}] 执行 {} 个计划步骤", lambda: task_id, lambda: sum(map(len, plan))
+                    )
+                    executed = await self.planner.execute(plan, tools)
+                    messages.extend(self.planner.to_messages(executed))
+            
             # 运行代理循环（有限迭代次数）
             max_iterations = 15
             iteration = 0
@@ -138,7 +248,7 @@ class SubagentManager:
                             "type": "function",
                             "function": {
                                 "name": tc.name,
-                                "arguments": json.dumps(tc.arguments),
+                                "arguments": orjson.dumps(tc.arguments).decode(),
                             },
                         }
                         for tc in response.tool_calls
@@ -149,17 +259,21 @@ class SubagentManager:
                         "tool_calls": tool_call_dicts,
                     })
                     
-                    # 执行工具
-                    for tool_call in response.tool_calls:
-                        args_str = json.dumps(tool_call.arguments)
-                        logger.debug(f"子代理 [{task_id}] 执行：{tool_call.name}，参数：{args_str}")
-                        result = await tools.execute(tool_call.name, tool_call.arguments)
+                    # 执行工具（并发安全的调用并行执行，结果按原顺序追加）
+                    for tc in tool_call_dicts:
+                        fn = tc["function"]
+                        logger.debug("子代理 [{}] 执行：{}，参数：{}", task_id, fn["name"], fn["arguments"])
+                    results = await tools.execute_many(
+                        [(tc.name, tc.arguments) for tc in response.tool_calls]
+                    )
+                    for tool_call, result in zip(response.tool_calls, results):
                         messages.append({
                             "role": "tool",
                             "tool_call_id": tool_call.id,
                             "name": tool_call.name,
                             "content": result,
                         })
+                    _compact_tool_results(messages)
                 else:
                     final_result = response.content
                     break
@@ -184,60 +298,67 @@ class SubagentManager:
         origin: dict[str, str],
         status: str,
     ) -> None:
-        """通过消息总线向主代理通知子代理结果。"""
-        status_text = "成功完成" if status == "ok" else "失败"
+        """
+        通过消息总线向主代理通知子代理结果。
         
-        announce_content = f"""[子代理 '{label}' {status_text}]
+        同一会话在 announce_delay_ms 窗口内完成的多个子代理结果会合并为一条系统消息，
+        这样主代理只需一次 LLM 调用即可汇总它们。
+        """
+        status_text = "成功完成" if status == "ok" else "失败"
+        section = f"""[子代理 '{label}' {status_text}]
 
 任务：{task}
 
 结果：
-{result}
-
-自然地为用户总结。保持简短（1-2 句话）。不要提及技术细节如"子代理"或任务 ID。"""
+{result}"""
+        
+        key = f"{origin['channel']}:{origin['chat_id']}"
+        self._pending_announcements.setdefault(key, []).append(section)
+        logger.debug("子代理 [{}] 的结果已加入 {} 的通知队列", task_id, key)
+        
+        delay = self.config.announce_delay_ms / 1000
+        if delay <= 0:
+            await self._flush_announcements(key)
+        elif key not in self._flush_tasks:
+            self._flush_tasks[key] = asyncio.create_task(self._flush_after(key, delay))
+    
+    async def _flush_after(self, key: str, delay: float) -> None:
+        """等待合并窗口结束后发送通知。"""
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self._flush_tasks.pop(key, None)
+        await self._flush_announcements(key)
+    
+    async def _flush_announcements(self, key: str) -> None:
+        """将某个会话的待发送通知合并为一条系统消息发布。"""
+        sections = self._pending_announcements.pop(key, None)
+        if not sections:
+            return
+        
+        announce_content = "\n\n---\n\n".join(sections) + (
+            '\n\n自然地为用户总结。保持简短（1-2 句话）。不要提及技术细节如"子代理"或任务 ID。'
+        )
         
         # 作为系统消息注入以触发主代理
         msg = InboundMessage(
             channel="system",
             sender_id="subagent",
-            chat_id=f"{origin['channel']}:{origin['chat_id']}",
+            chat_id=key,
             content=announce_content,
         )
         
         await self.bus.publish_inbound(msg)
-        logger.debug(f"子代理 [{task_id}] 已向 {origin['channel']}:{origin['chat_id']} 通知结果")
+        logger.debug("已向 {} 通知 {} 个子代理结果", key, len(sections))
     
     def _build_subagent_prompt(self, task: str) -> str:
         """为子代理构建专注的系统提示词。"""
-        return f"""# 子代理
-
-你是由主代理生成来完成特定任务的子代理。
-
-## 你的任务
-{task}
-
-## 规则
-1. 保持专注 - 只完成分配的任务，不做其他事情
-2. 你的最终响应将报告回主代理
-3. 不要发起对话或承担旁支任务
-4. 在你的发现中要简洁但信息丰富
-
-## 你能做什么
-- 在工作区中读写文件
-- 执行 shell 命令
-- 搜索网页并获取网页内容
-- 彻底完成任务
-
-## 你不能做什么
-- 直接向用户发送消息（无消息工具可用）
-- 生成其他子代理
-- 访问主代理的对话历史
-
-## 工作区
-你的工作区位于：{self.workspace}
-
-当你完成任务时，提供你的发现或行动的清晰总结。"""
+        return self._prompt_template.replace("{TASK}", task)
     
     def get_running_count(self) -> int:
         """返回当前运行的子代理数量。"""
         return len(self._running_tasks)
+    
+    def get_status(self) -> dict[str, str]:
+        """返回未完成子代理的状态（queued 或 running），按任务 ID 索引。"""
+        return dict(self._task_status)
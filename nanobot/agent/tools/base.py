@@ -1,7 +1,7 @@
 """代理工具的基类。"""
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Callable
 
 
 class Tool(ABC):
@@ -20,6 +20,15 @@ class Tool(ABC):
         "object": dict,
     }
     
+    # 除类型外需要逐层验证的 schema 关键字
+    _CONSTRAINT_KEYS = ("enum", "minimum", "maximum", "minLength", "maxLength", "properties", "required", "items")
+    
+    # 是否可与其他并发安全的工具调用并行执行（只读、无共享副作用）
+    concurrency_safe: bool = False
+    
+    # 首次验证时从 parameters 编译的验证函数
+    _validator: Callable[[Any], list[str]] | None = None
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -53,41 +62,122 @@ class Tool(ABC):
 
     def validate_params(self, params: dict[str, Any]) -> list[str]:
         """根据 JSON schema 验证工具参数。返回错误列表（有效时为空）。"""
-        schema = self.parameters or {}
-        if schema.get("type", "object") != "object":
-            raise ValueError(f"Schema 必须是 object 类型，当前为 {schema.get('type')!r}")
-        return self._validate(params, {**schema, "type": "object"}, "")
+        validator = self._validator
+        if validator is None:
+            schema = self.parameters or {}
+            if schema.get("type", "object") != "object":
+                raise ValueError(f"Schema 必须是 object 类型，当前为 {schema.get('type')!r}")
+            # 首次调用时将 schema 编译为验证函数，之后的调用不再解释 schema
+            schema = {**schema, "type": "object"}
+            validator = self._compile_trivial_validator(schema) or self._compile_validator(schema, "")
+            self._validator = validator
+        return validator(params)
 
-    def _validate(self, val: Any, schema: dict[str, Any], path: str) -> list[str]:
-        t, label = schema.get("type"), path or "parameter"
-        if t in self._TYPE_MAP and not isinstance(val, self._TYPE_MAP[t]):
-            return [f"{label} 应该是 {t} 类型"]
+    def _compile_trivial_validator(self, schema: dict[str, Any]) -> Callable[[Any], list[str]] | None:
+        """
+        为只有必需键和顶层类型检查的 schema 生成扁平验证函数。
+        
+        大多数工具的参数都是几个无约束的标量字段，这种情况下无需逐层调用闭包。
+        schema 含有其他约束时返回 None。
+        """
+        props = schema.get("properties", {})
+        if any(key in prop for prop in props.values() for key in self._CONSTRAINT_KEYS):
+            return None
+        required = [(k, f"缺少必需的 {k}") for k in schema.get("required", [])]
+        types = {
+            k: (self._TYPE_MAP[prop["type"]], [f"{k} 应该是 {prop['type']} 类型"])
+            for k, prop in props.items()
+            if prop.get("type") in self._TYPE_MAP
+        }
+        type_error = ["parameter 应该是 object 类型"]
+        
+        def validate(params: Any) -> list[str]:
+            if not isinstance(params, dict):
+                return list(type_error)
+            errors = [msg for k, msg in required if k not in params]
+            for k, v in params.items():
+                if (check := types.get(k)) is not None and not isinstance(v, check[0]):
+                    errors.extend(check[1])
+            return errors
         
-        errors = []
-        if "enum" in schema and val not in schema["enum"]:
-            errors.append(f"{label} 必须是 {schema['enum']} 之一")
+        return validate
+
+    def _compile_validator(self, schema: dict[str, Any], path: str) -> Callable[[Any], list[str]]:
+        """将 schema 节点编译为验证函数，错误信息在编译时预先生成。"""
+        t, label = schema.get("type"), path or "parameter"
+        expected = self._TYPE_MAP.get(t)
+        type_error = [f"{label} 应该是 {t} 类型"]
+        checks: list[Callable[[Any, list[str]], None]] = []
+
+        if "enum" in schema:
+            enum, enum_msg = schema["enum"], f"{label} 必须是 {schema['enum']} 之一"
+            def check_enum(val: Any, errors: list[str]) -> None:
+                if val not in enum:
+                    errors.append(enum_msg)
+            checks.append(check_enum)
+
+        bounds: list[tuple[Callable[[Any], bool], str]] = []
         if t in ("integer", "number"):
-            if "minimum" in schema and val < schema["minimum"]:
-                errors.append(f"{label} 必须 >= {schema['minimum']}")
-            if "maximum" in schema and val > schema["maximum"]:
-                errors.append(f"{label} 必须 <= {schema['maximum']}")
+            if "minimum" in schema:
+                lo = schema["minimum"]
+                bounds.append((lambda v: v < lo, f"{label} 必须 >= {lo}"))
+            if "maximum" in schema:
+                hi = schema["maximum"]
+                bounds.append((lambda v: v > hi, f"{label} 必须 <= {hi}"))
         if t == "string":
-            if "minLength" in schema and len(val) < schema["minLength"]:
-                errors.append(f"{label} 至少 {schema['minLength']} 个字符")
-            if "maxLength" in schema and len(val) > schema["maxLength"]:
-                errors.append(f"{label} 最多 {schema['maxLength']} 个字符")
+            if "minLength" in schema:
+                min_len = schema["minLength"]
+                bounds.append((lambda v: len(v) < min_len, f"{label} 至少 {min_len} 个字符"))
+            if "maxLength" in schema:
+                max_len = schema["maxLength"]
+                bounds.append((lambda v: len(v) > max_len, f"{label} 最多 {max_len} 个字符"))
+        if bounds:
+            def check_bounds(val: Any, errors: list[str]) -> None:
+                for violated, msg in bounds:
+                    if violated(val):
+                        errors.append(msg)
+            checks.append(check_bounds)
+
         if t == "object":
-            props = schema.get("properties", {})
-            for k in schema.get("required", []):
-                if k not in val:
-                    errors.append(f"缺少必需的 {path + '.' + k if path else k}")
-            for k, v in val.items():
-                if k in props:
-                    errors.extend(self._validate(v, props[k], path + '.' + k if path else k))
+            required = [
+                (k, f"缺少必需的 {path + '.' + k if path else k}")
+                for k in schema.get("required", [])
+            ]
+            props = {
+                k: self._compile_validator(v, path + '.' + k if path else k)
+                for k, v in schema.get("properties", {}).items()
+            }
+            def check_object(val: dict[str, Any], errors: list[str]) -> None:
+                for k, msg in required:
+                    if k not in val:
+                        errors.append(msg)
+                for k, v in val.items():
+                    if (sub := props.get(k)) is not None:
+                        errors.extend(sub(v))
+            checks.append(check_object)
+
         if t == "array" and "items" in schema:
-            for i, item in enumerate(val):
-                errors.extend(self._validate(item, schema["items"], f"{path}[{i}]" if path else f"[{i}]"))
-        return errors
+            items = schema["items"]
+            # 元素路径包含下标，按下标按需编译并缓存
+            item_validators: dict[int, Callable[[Any], list[str]]] = {}
+            def check_array(val: list[Any], errors: list[str]) -> None:
+                for i, item in enumerate(val):
+                    sub = item_validators.get(i)
+                    if sub is None:
+                        sub = self._compile_validator(items, f"{path}[{i}]" if path else f"[{i}]")
+                        item_validators[i] = sub
+                    errors.extend(sub(item))
+            checks.append(check_array)
+
+        def validate(val: Any) -> list[str]:
+            if expected is not None and not isinstance(val, expected):
+                return list(type_error)
+            errors: list[str] = []
+            for check in checks:
+                check(val, errors)
+            return errors
+
+        return validate
     
     def to_schema(self) -> dict[str, Any]:
         """将工具转换为 OpenAI 函数 schema 格式。"""
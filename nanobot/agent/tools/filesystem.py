@@ -17,6 +17,8 @@ def _resolve_path(path: str, allowed_dir: Path | None = None) -> Path:
 class ReadFileTool(Tool):
     """读取文件内容的工具。"""
     
+    concurrency_safe = True
+    
     def __init__(self, allowed_dir: Path | None = None):
         self._allowed_dir = allowed_dir
 
@@ -164,6 +166,8 @@ class EditFileTool(Tool):
 class ListDirTool(Tool):
     """列出目录内容的工具。"""
     
+    concurrency_safe = True
+    
     def __init__(self, allowed_dir: Path | None = None):
         self._allowed_dir = allowed_dir
 
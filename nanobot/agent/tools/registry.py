@@ -1,5 +1,6 @@
 """工具注册表，用于动态管理工具。"""
 
+import asyncio
 from typing import Any
 
 from nanobot.agent.tools.base import Tool
@@ -14,14 +15,17 @@ class ToolRegistry:
     
     def __init__(self):
         self._tools: dict[str, Tool] = {}
+        self._defs_cache: list[dict[str, Any]] | None = None
     
     def register(self, tool: Tool) -> None:
         """注册一个工具。"""
         self._tools[tool.name] = tool
+        self._defs_cache = None
     
     def unregister(self, name: str) -> None:
         """按名称注销工具。"""
         self._tools.pop(name, None)
+        self._defs_cache = None
     
     def get(self, name: str) -> Tool | None:
         """按名称获取工具。"""
@@ -32,8 +36,10 @@ class ToolRegistry:
         return name in self._tools
     
     def get_definitions(self) -> list[dict[str, Any]]:
-        """获取所有工具的 OpenAI 格式定义。"""
-        return [tool.to_schema() for tool in self._tools.values()]
+        """获取所有工具的 OpenAI 格式定义（在注册/注销之间缓存）。"""
+        if self._defs_cache is None:
+            self._defs_cache = [tool.to_schema() for tool in self._tools.values()]
+        return self._defs_cache
     
     async def execute(self, name: str, params: dict[str, Any]) -> str:
         """
@@ -61,6 +67,40 @@ class ToolRegistry:
         except Exception as e:
             return f"执行 {name} 时出错：{str(e)}"
     
+    async def execute_many(self, calls: list[tuple[str, dict[str, Any]]]) -> list[str]:
+        """
+        执行同一轮中的多个工具调用。
+        
+        连续的并发安全调用通过 asyncio.gather 并行执行，其余调用按顺序执行，
+        以保持有副作用工具的执行顺序。
+        
+        参数:
+            calls: (工具名称, 工具参数) 列表。
+        
+        返回:
+            与 calls 顺序一致的结果列表。
+        """
+        results: list[str] = []
+        i = 0
+        while i < len(calls):
+            j = i
+            while j < len(calls) and self._is_concurrency_safe(calls[j][0]):
+                j += 1
+            if j - i > 1:
+                results.extend(await asyncio.gather(
+                    *(self.execute(name, params) for name, params in calls[i:j])
+                ))
+                i = j
+            else:
+                name, params = calls[i]
+                results.append(await self.execute(name, params))
+                i += 1
+        return results
+    
+    def _is_concurrency_safe(self, name: str) -> bool:
+        tool = self._tools.get(name)
+        return tool is not None and tool.concurrency_safe
+    
     @property
     def tool_names(self) -> list[str]:
         """获取已注册工具名称列表。"""
@@ -46,6 +46,8 @@ def _validate_url(url: str) -> tuple[bool, str]:
 class WebSearchTool(Tool):
     """使用 Brave Search API 搜索网页。"""
     
+    concurrency_safe = True
+    
     name = "web_search"
     description = "搜索网页。返回标题、URL 和摘要。"
     parameters = {
@@ -93,6 +95,8 @@ class WebSearchTool(Tool):
 class WebFetchTool(Tool):
     """使用 Readability 从 URL 获取和提取内容。"""
     
+    concurrency_safe = True
+    
     name = "web_fetch"
     description = "获取 URL 并提取可读内容（HTML → markdown/text）。"
     parameters = {
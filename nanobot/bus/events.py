@@ -5,7 +5,7 @@ from datetime import datetime
 from typing import Any
 
 
-@dataclass
+@dataclass(slots=True)
 class InboundMessage:
     """从聊天频道接收的消息。"""
     
@@ -16,14 +16,19 @@ class InboundMessage:
     timestamp: datetime = field(default_factory=datetime.now)
     media: list[str] = field(default_factory=list)  # 媒体 URL 列表
     metadata: dict[str, Any] = field(default_factory=dict)  # 频道特定的数据
+    _session_key: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        # channel 和 chat_id 构造后不再改变，预先计算会话键
+        self._session_key = f"{self.channel}:{self.chat_id}"
     
     @property
     def session_key(self) -> str:
         """用于会话标识的唯一键。"""
-        return f"{self.channel}:{self.chat_id}"
+        return self._session_key
 
 
-@dataclass
+@dataclass(slots=True)
 class OutboundMessage:
     """要发送到聊天频道的消息。"""
     
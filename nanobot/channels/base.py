@@ -1,7 +1,7 @@
 """聊天平台的频道基类接口。"""
 
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Callable
 
 from loguru import logger
 
@@ -17,6 +17,8 @@ class BaseChannel(ABC):
     """
     
     name: str = "base"
+    # 运行状态变化时的回调 (频道名称, 是否运行)，由 ChannelManager 设置
+    _status_listener: Callable[[str, bool], None] | None = None
     
     def __init__(self, config: Any, bus: MessageBus):
         """
@@ -29,6 +31,22 @@ class BaseChannel(ABC):
         self.config = config
         self.bus = bus
         self._running = False
+        self.refresh_allow_list()
+    
+    @property
+    def _running(self) -> bool:
+        """频道是否正在运行；赋值时通知状态监听器。"""
+        return self._running_flag
+    
+    @_running.setter
+    def _running(self, value: bool) -> None:
+        self._running_flag = value
+        if self._status_listener:
+            self._status_listener(self.name, value)
+    
+    def refresh_allow_list(self) -> None:
+        """根据 config.allow_from 重建允许集合（配置变更后调用）。"""
+        self._allow_set: frozenset[str] = frozenset(getattr(self.config, "allow_from", None) or ())
     
     @abstractmethod
     async def start(self) -> None:
@@ -67,19 +85,15 @@ class BaseChannel(ABC):
         返回:
             如果允许返回 True，否则返回 False。
         """
-        allow_list = getattr(self.config, "allow_from", [])
-        
         # 如果没有允许列表，允许所有人
-        if not allow_list:
+        if not self._allow_set:
             return True
         
         sender_str = str(sender_id)
-        if sender_str in allow_list:
+        if sender_str in self._allow_set:
             return True
         if "|" in sender_str:
-            for part in sender_str.split("|"):
-                if part and part in allow_list:
-                    return True
+            return any(part in self._allow_set for part in sender_str.split("|") if part)
         return False
     
     async def _handle_message(
@@ -1,11 +1,10 @@
 """使用 lark-oapi SDK 和 WebSocket 长连接的飞书/ Lark 频道实现。"""
 
 import asyncio
-import json
 import threading
-from collections import OrderedDict
 from typing import Any
 
+import orjson
 from loguru import logger
 
 from nanobot.bus.events import OutboundMessage
@@ -37,6 +36,9 @@ MSG_TYPE_MAP = {
     "sticker": "[表情]",
 }
 
+# 每一代去重集合的容量
+DEDUP_GENERATION_SIZE = 500
+
 
 class FeishuChannel(BaseChannel):
     """
@@ -58,8 +60,13 @@ class FeishuChannel(BaseChannel):
         self._client: Any = None
         self._ws_client: Any = None
         self._ws_thread: threading.Thread | None = None
-        self._processed_message_ids: OrderedDict[str, None] = OrderedDict()  # 有序去重缓存
+        # 两代去重集合：_recent 满 DEDUP_GENERATION_SIZE 条后整体轮换为 _older，
+        # 每条消息 O(1)，始终记住最近 500~1000 条消息 ID
+        self._recent_message_ids: set[str] = set()
+        self._older_message_ids: set[str] = set()
         self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop_event: asyncio.Event | None = None
+        self._bg_tasks: set[asyncio.Task[None]] = set()  # 持有后台任务的引用，防止被回收
     
     async def start(self) -> None:
         """使用 WebSocket 长连接启动飞书机器人。"""
@@ -73,6 +80,7 @@ class FeishuChannel(BaseChannel):
         
         self._running = True
         self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
         
         # 创建用于发送消息的 Lark 客户端
         self._client = lark.Client.builder() \
@@ -110,13 +118,14 @@ class FeishuChannel(BaseChannel):
         logger.info("飞书机器人已使用 WebSocket 长连接启动")
         logger.info("不需要公共 IP - 使用 WebSocket 接收事件")
         
-        # 保持运行直到停止
-        while self._running:
-            await asyncio.sleep(1)
+        # 保持运行直到 stop() 被调用
+        await self._stop_event.wait()
     
     async def stop(self) -> None:
         """停止飞书机器人。"""
         self._running = False
+        if self._stop_event:
+            self._stop_event.set()
         if self._ws_client:
             try:
                 self._ws_client.stop()
@@ -171,7 +180,7 @@ class FeishuChannel(BaseChannel):
                 receive_id_type = "open_id"
             
             # 构建文本消息内容
-            content = json.dumps({"text": msg.content})
+            content = orjson.dumps({"text": msg.content}).decode()
             
             request = CreateMessageRequest.builder() \
                 .receive_id_type(receive_id_type) \
@@ -196,49 +205,60 @@ class FeishuChannel(BaseChannel):
         except Exception as e:
             logger.error(f"发送飞书消息时出错：{e}")
     
+    def _is_duplicate(self, message_id: str) -> bool:
+        """检查消息是否已处理过，未处理过则记录它。"""
+        if message_id in self._recent_message_ids or message_id in self._older_message_ids:
+            return True
+        self._recent_message_ids.add(message_id)
+        if len(self._recent_message_ids) >= DEDUP_GENERATION_SIZE:
+            self._older_message_ids = self._recent_message_ids
+            self._recent_message_ids = set()
+        return False
+    
     def _on_message_sync(self, data: "P2ImMessageReceiveV1") -> None:
         """
         传入消息的同步处理器（从 WebSocket 线程调用）。
-        在主事件循环中调度异步处理。
+        
+        lark-oapi 的 WebSocket 客户端没有 asyncio 入口（它绑定模块级事件循环，
+        且连接时使用阻塞 HTTP 请求），因此只能运行在单独线程中。
+        去重和机器人消息过滤在此线程内完成，只有需要处理的消息才跨线程调度到主事件循环。
         """
-        if self._loop and self._loop.is_running():
-            asyncio.run_coroutine_threadsafe(self._on_message(data), self._loop)
+        if not self._loop or not self._loop.is_running():
+            return
+        try:
+            message = data.event.message
+            if self._is_duplicate(message.message_id):
+                return
+            if data.event.sender.sender_type == "bot":
+                return
+        except Exception as e:
+            logger.error(f"处理飞书消息时出错：{e}")
+            return
+        asyncio.run_coroutine_threadsafe(self._on_message(data), self._loop)
     
     async def _on_message(self, data: "P2ImMessageReceiveV1") -> None:
-        """处理来自飞书的传入消息。"""
+        """处理来自飞书的传入消息（已在 WebSocket 线程中去重并过滤机器人消息）。"""
         try:
             event = data.event
             message = event.message
             sender = event.sender
-            
-            # 去重检查
             message_id = message.message_id
-            if message_id in self._processed_message_ids:
-                return
-            self._processed_message_ids[message_id] = None
-            
-            # 修剪缓存：超过 1000 时保留最近的 500
-            while len(self._processed_message_ids) > 1000:
-                self._processed_message_ids.popitem(last=False)
-            
-            # 跳过机器人消息
-            sender_type = sender.sender_type
-            if sender_type == "bot":
-                return
             
             sender_id = sender.sender_id.open_id if sender.sender_id else "unknown"
             chat_id = message.chat_id
             chat_type = message.chat_type  # "p2p" 或 "group"
             msg_type = message.message_type
             
-            # 添加"已看到"表情
-            await self._add_reaction(message_id, "THUMBSUP")
+            # 添加"已看到"表情（后台执行，不阻塞消息转发）
+            task = asyncio.create_task(self._add_reaction(message_id, "THUMBSUP"))
+            self._bg_tasks.add(task)
+            task.add_done_callback(self._bg_tasks.discard)
             
             # 解析消息内容
             if msg_type == "text":
                 try:
-                    content = json.loads(message.content).get("text", "")
-                except json.JSONDecodeError:
+                    content = orjson.loads(message.content).get("text", "")
+                except orjson.JSONDecodeError:
                     content = message.content or ""
             else:
                 content = MSG_TYPE_MAP.get(msg_type, f"[{msg_type}]")
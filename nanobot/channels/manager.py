@@ -1,6 +1,7 @@
 """频道管理器，用于协调聊天频道。"""
 
 import asyncio
+import importlib
 from typing import Any
 
 from loguru import logger
@@ -10,6 +11,14 @@ from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import Config
 
+# 频道名称 -> (模块路径, 类名, 日志中的显示名称)；频道模块在启用时才导入，避免加载未使用的 SDK
+_CHANNEL_REGISTRY: dict[str, tuple[str, str, str]] = {
+    "telegram": ("nanobot.channels.telegram", "TelegramChannel", "Telegram 频道"),
+    "whatsapp": ("nanobot.channels.whatsapp", "WhatsAppChannel", "WhatsApp 频道"),
+    "discord": ("nanobot.channels.discord", "DiscordChannel", "Discord 频道"),
+    "feishu": ("nanobot.channels.feishu", "FeishuChannel", "飞书频道"),
+}
+
 
 class ChannelManager:
     """
@@ -26,57 +35,42 @@ class ChannelManager:
         self.bus = bus
         self.channels: dict[str, BaseChannel] = {}
         self._dispatch_task: asyncio.Task | None = None
+        # 每个频道独立的出站队列和消费任务，慢速频道不会阻塞其他频道
+        self._queues: dict[str, asyncio.Queue[OutboundMessage]] = {}
+        self._consumers: dict[str, asyncio.Task[None]] = {}
+        self._max_queue_size = 1000
+        # 每个频道在途发送任务的上限（用于背压），以及每个聊天最后一个发送任务（用于保序）
+        self._max_inflight = 128
+        self._chat_tails: dict[str, asyncio.Task[None]] = {}
         
         self._init_channels()
+        
+        # 状态快照，在频道运行状态变化时更新，get_status 直接返回
+        self._status_cache: dict[str, dict[str, bool]] = {}
+        for name, channel in self.channels.items():
+            self._status_cache[name] = {"enabled": True, "running": channel._running}
+            channel._status_listener = self.notify_running
     
     def _init_channels(self) -> None:
         """根据配置初始化频道。"""
-        
-        # Telegram 频道
-        if self.config.channels.telegram.enabled:
-            try:
-                from nanobot.channels.telegram import TelegramChannel
-                self.channels["telegram"] = TelegramChannel(
-                    self.config.channels.telegram,
-                    self.bus,
-                    groq_api_key=self.config.providers.groq.api_key,
-                )
-                logger.info("Telegram 频道已启用")
-            except ImportError as e:
-                logger.warning(f"Telegram 频道不可用：{e}")
-        
-        # WhatsApp 频道
-        if self.config.channels.whatsapp.enabled:
-            try:
-                from nanobot.channels.whatsapp import WhatsAppChannel
-                self.channels["whatsapp"] = WhatsAppChannel(
-                    self.config.channels.whatsapp, self.bus
-                )
-                logger.info("WhatsApp 频道已启用")
-            except ImportError as e:
-                logger.warning(f"WhatsApp 频道不可用：{e}")
-
-        # Discord 频道
-        if self.config.channels.discord.enabled:
-            try:
-                from nanobot.channels.discord import DiscordChannel
-                self.channels["discord"] = DiscordChannel(
-                    self.config.channels.discord, self.bus
-                )
-                logger.info("Discord 频道已启用")
-            except ImportError as e:
-                logger.warning(f"Discord 频道不可用：{e}")
-        
-        # 飞书频道
-        if self.config.channels.feishu.enabled:
+        for name, (module, class_name, display_name) in _CHANNEL_REGISTRY.items():
+            channel_config = getattr(self.config.channels, name)
+            if not channel_config.enabled:
+                continue
             try:
-                from nanobot.channels.feishu import FeishuChannel
-                self.channels["feishu"] = FeishuChannel(
-                    self.config.channels.feishu, self.bus
+                channel_cls = getattr(importlib.import_module(module), class_name)
+                self.channels[name] = channel_cls(
+                    channel_config, self.bus, **self._channel_kwargs(name)
                 )
-                logger.info("飞书频道已启用")
+                logger.info(f"{display_name}已启用")
             except ImportError as e:
-                logger.warning(f"飞书频道不可用：{e}")
+                logger.warning(f"{display_name}不可用：{e}")
+    
+    def _channel_kwargs(self, name: str) -> dict[str, Any]:
+        """获取特定频道额外的构造参数。"""
+        if name == "telegram":
+            return {"groq_api_key": self.config.providers.groq.api_key}
+        return {}
     
     async def start_all(self) -> None:
         """启动 WhatsApp 频道和出站消息分发器。"""
@@ -84,29 +78,39 @@ class ChannelManager:
             logger.warning("没有启用的频道")
             return
         
-        # 启动出站消息分发器
+        # 启动每个频道的出站消费者和出站消息分发器（只有一个频道时由分发器直接发送）
+        if len(self.channels) > 1:
+            for name, channel in self.channels.items():
+                self._queues[name] = asyncio.Queue(maxsize=self._max_queue_size)
+                self._consumers[name] = asyncio.create_task(self._drain(name, channel))
         self._dispatch_task = asyncio.create_task(self._dispatch_outbound())
         
-        # 启动 WhatsApp 频道
-        tasks = []
-        for name, channel in self.channels.items():
-            logger.info(f"正在启动 {name} 频道...")
-            tasks.append(asyncio.create_task(channel.start()))
-        
-        # 等待所有频道完成（它们应该一直运行）
-        await asyncio.gather(*tasks, return_exceptions=True)
+        # 并发启动所有频道，并等待它们完成（它们应该一直运行）
+        async with asyncio.TaskGroup() as tg:
+            for name, channel in self.channels.items():
+                logger.info(f"正在启动 {name} 频道...")
+                tg.create_task(self._start_channel(name, channel), name=f"start:{name}")
+    
+    async def _start_channel(self, name: str, channel: BaseChannel) -> None:
+        """运行单个频道，单个频道失败不会取消其他频道。"""
+        try:
+            await channel.start()
+        except Exception as e:
+            logger.error(f"{name} 频道运行出错：{e}")
     
     async def stop_all(self) -> None:
         """停止所有频道和分发器。"""
         logger.info("正在停止所有频道...")
         
-        # 停止分发器
-        if self._dispatch_task:
-            self._dispatch_task.cancel()
-            try:
-                await self._dispatch_task
-            except asyncio.CancelledError:
-                pass
+        # 停止分发器和频道消费者
+        for task in [self._dispatch_task, *self._consumers.values()]:
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._consumers.clear()
         
         # 停止所有频道
         for name, channel in self.channels.items():
@@ -117,43 +121,92 @@ class ChannelManager:
                 logger.error(f"停止 {name} 时出错：{e}")
     
     async def _dispatch_outbound(self) -> None:
-        """将出站消息分发到适当的频道。"""
+        """将出站消息路由到对应频道的队列。"""
         logger.info("出站消息分发器已启动")
         
+        # 只有一个频道时跳过中间队列，直接调度发送
+        solo = next(iter(self.channels.values())) if len(self.channels) == 1 else None
+        solo_name = solo.name if solo else None
+        inflight: set[asyncio.Task[None]] = set()
+        
         while True:
             try:
-                msg = await asyncio.wait_for(
-                    self.bus.consume_outbound(),
-                    timeout=1.0
-                )
+                # 阻塞等待消息；停止时通过任务取消退出
+                msg = await self.bus.consume_outbound()
                 
-                channel = self.channels.get(msg.channel)
-                if channel:
-                    try:
-                        await channel.send(msg)
-                    except Exception as e:
-                        logger.error(f"发送到 {msg.channel} 时出错：{e}")
+                if solo is not None and msg.channel == solo_name:
+                    await self._schedule_send(solo, msg, inflight)
+                    continue
+                
+                queue = self._queues.get(msg.channel)
+                if queue:
+                    await queue.put(msg)
                 else:
                     logger.warning(f"未知频道：{msg.channel}")
                     
-            except asyncio.TimeoutError:
-                continue
             except asyncio.CancelledError:
                 break
     
+    async def _drain(self, name: str, channel: BaseChannel) -> None:
+        """消费单个频道的出站队列。"""
+        queue = self._queues[name]
+        inflight: set[asyncio.Task[None]] = set()
+        while True:
+            msg = await queue.get()
+            await self._schedule_send(channel, msg, inflight)
+    
+    async def _schedule_send(
+        self,
+        channel: BaseChannel,
+        msg: OutboundMessage,
+        inflight: set[asyncio.Task[None]],
+    ) -> None:
+        """
+        在后台发送消息，使同一频道的不同聊天可以并发发送。
+        
+        同一聊天的消息依次发送以保持顺序；频道在途任务达到上限时等待其中一个完成。
+        """
+        if len(inflight) >= self._max_inflight:
+            await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+        
+        key = f"{msg.channel}:{msg.chat_id}"
+        task = asyncio.create_task(self._send(channel, msg, self._chat_tails.get(key)))
+        self._chat_tails[key] = task
+        inflight.add(task)
+        
+        def _done(t: asyncio.Task[None]) -> None:
+            inflight.discard(t)
+            if self._chat_tails.get(key) is t:
+                del self._chat_tails[key]
+        task.add_done_callback(_done)
+    
+    async def _send(
+        self,
+        channel: BaseChannel,
+        msg: OutboundMessage,
+        previous: asyncio.Task[None] | None,
+    ) -> None:
+        """等待同一聊天的上一条消息发送完成后发送此消息。"""
+        if previous:
+            await asyncio.wait([previous])
+        try:
+            await channel.send(msg)
+        except Exception as e:
+            logger.error(f"发送到 {msg.channel} 时出错：{e}")
+    
     def get_channel(self, name: str) -> BaseChannel | None:
         """通过名称获取频道。"""
         return self.channels.get(name)
     
+    def notify_running(self, name: str, running: bool) -> None:
+        """更新频道运行状态快照。"""
+        status = self._status_cache.get(name)
+        if status is not None:
+            status["running"] = running
+    
     def get_status(self) -> dict[str, Any]:
-        """获取所有频道的状态。"""
-        return {
-            name: {
-                "enabled": True,
-                "running": channel._running
-            }
-            for name, channel in self.channels.items()
-        }
+        """获取所有频道的状态（返回共享快照，调用方不应修改）。"""
+        return self._status_cache
     
     @property
     def enabled_channels(self) -> list[str]:
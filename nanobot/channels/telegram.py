@@ -2,15 +2,59 @@
 
 import asyncio
 import re
+from collections import OrderedDict
+from pathlib import Path
 
 from loguru import logger
 from telegram import Update
-from telegram.ext import Application, MessageHandler, filters, ContextTypes
+from telegram.ext import Application, ContextTypes, MessageHandler, filters
 
 from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import TelegramConfig
+from nanobot.providers.transcription import GroqTranscriptionProvider
+
+# 出站消息合并窗口（秒）和合并后单条消息的最大字符数（Telegram 上限为 4096）
+SEND_COALESCE_DELAY = 0.025
+SEND_COALESCE_MAX_CHARS = 3900
+
+# sender_id -> chat_id 映射最多保留的条目数
+CHAT_ID_CACHE_SIZE = 10000
+
+# 媒体类型按优先级排列：(消息属性, 媒体类型, 取文件对象的函数)
+_MEDIA_ACCESSORS = (
+    ("photo", "image", lambda m: m.photo[-1]),  # 最大的照片
+    ("voice", "voice", lambda m: m.voice),
+    ("audio", "audio", lambda m: m.audio),
+    ("document", "file", lambda m: m.document),
+)
+
+# MIME 类型和媒体类型到文件扩展名的映射
+_MIME_EXT = {
+    "image/jpeg": ".jpg", "image/png": ".png", "image/gif": ".gif",
+    "audio/ogg": ".ogg", "audio/mpeg": ".mp3", "audio/mp4": ".m4a",
+}
+_TYPE_EXT = {"image": ".jpg", "voice": ".ogg", "audio": ".mp3", "file": ""}
+
+# Markdown 转换使用的预编译正则表达式
+_RE_CODE_BLOCK = re.compile(r'```[\w]*\n?([\s\S]*?)```')
+_RE_INLINE_CODE = re.compile(r'`([^`]+)`')
+_RE_HEADING = re.compile(r'^#{1,6}\s+(.+)$', re.MULTILINE)
+_RE_BLOCKQUOTE = re.compile(r'^>\s*(.*)$', re.MULTILINE)
+_RE_LINK = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+_RE_BOLD_STARS = re.compile(r'\*\*(.+?)\*\*')
+_RE_BOLD_UNDERSCORES = re.compile(r'__(.+?)__')
+_RE_ITALIC = re.compile(r'(?<![a-zA-Z0-9])_([^_]+)_(?![a-zA-Z0-9])')
+_RE_STRIKE = re.compile(r'~~(.+?)~~')
+_RE_BULLET = re.compile(r'^[-*]\s+', re.MULTILINE)
+_RE_PLACEHOLDER = re.compile(r'\x00(IC|CB)(\d+)\x00')
+
+# 单次遍历完成 HTML 特殊字符转义
+_HTML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+# 可能触发 markdown 转换的字符；不含这些字符的文本只需 HTML 转义
+_MD_CHARS = frozenset("`*_~[#>-")
 
 
 def _markdown_to_telegram_html(text: str) -> str:
@@ -20,13 +64,17 @@ def _markdown_to_telegram_html(text: str) -> str:
     if not text:
         return ""
     
+    # 纯文本快速路径
+    if _MD_CHARS.isdisjoint(text):
+        return text.translate(_HTML_ESCAPE_TABLE)
+    
     # 1. 提取并保护代码块（保护内容免受其他处理）
     code_blocks: list[str] = []
     def save_code_block(m: re.Match) -> str:
         code_blocks.append(m.group(1))
         return f"\x00CB{len(code_blocks) - 1}\x00"
     
-    text = re.sub(r'```[\w]*\n?([\s\S]*?)```', save_code_block, text)
+    text = _RE_CODE_BLOCK.sub(save_code_block, text)
     
     # 2. 提取并保护行内代码
     inline_codes: list[str] = []
@@ -34,44 +82,52 @@ def _markdown_to_telegram_html(text: str) -> str:
         inline_codes.append(m.group(1))
         return f"\x00IC{len(inline_codes) - 1}\x00"
     
-    text = re.sub(r'`([^`]+)`', save_inline_code, text)
+    text = _RE_INLINE_CODE.sub(save_inline_code, text)
     
     # 3. 标题 # 标题 -> 仅标题文本
-    text = re.sub(r'^#{1,6}\s+(.+)$', r'\1', text, flags=re.MULTILINE)
+    text = _RE_HEADING.sub(r'\1', text)
     
     # 4. 引用 > 文本 -> 仅文本（在 HTML 转义之前）
-    text = re.sub(r'^>\s*(.*)$', r'\1', text, flags=re.MULTILINE)
+    text = _RE_BLOCKQUOTE.sub(r'\1', text)
     
     # 5. 转义 HTML 特殊字符
-    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    text = text.translate(_HTML_ESCAPE_TABLE)
     
     # 6. 链接 [text](url) - 必须在粗体/斜体之前处理嵌套情况
-    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', text)
+    text = _RE_LINK.sub(r'<a href="\2">\1</a>', text)
     
     # 7. 粗体 **text** 或 __text__
-    text = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', text)
-    text = re.sub(r'__(.+?)__', r'<b>\1</b>', text)
+    text = _RE_BOLD_STARS.sub(r'<b>\1</b>', text)
+    text = _RE_BOLD_UNDERSCORES.sub(r'<b>\1</b>', text)
     
     # 8. 斜体 _text_（避免匹配单词内部如 some_var_name）
-    text = re.sub(r'(?<![a-zA-Z0-9])_([^_]+)_(?![a-zA-Z0-9])', r'<i>\1</i>', text)
+    text = _RE_ITALIC.sub(r'<i>\1</i>', text)
     
     # 9. 删除线 ~~text~~
-    text = re.sub(r'~~(.+?)~~', r'<s>\1</s>', text)
+    text = _RE_STRIKE.sub(r'<s>\1</s>', text)
     
     # 10. 项目符号列表 - item -> • item
-    text = re.sub(r'^[-*]\s+', '• ', text, flags=re.MULTILINE)
+    text = _RE_BULLET.sub('• ', text)
+    
+    # 11. 单次遍历恢复行内代码和代码块（内容转义后包裹 HTML 标签）
+    def restore(m: re.Match) -> str:
+        saved = inline_codes if m.group(1) == "IC" else code_blocks
+        idx = int(m.group(2))
+        if idx >= len(saved):
+            return m.group(0)
+        escaped = saved[idx].translate(_HTML_ESCAPE_TABLE)
+        if m.group(1) == "IC":
+            # 行内代码可能跨过代码块，吞掉其占位符，需先展开其中的代码块
+            if "\x00" in escaped:
+                escaped = _RE_PLACEHOLDER.sub(restore_code_block, escaped)
+            return f"<code>{escaped}</code>"
+        return f"<pre><code>{escaped}</code></pre>"
     
-    # 11. 使用 HTML 标签恢复行内代码
-    for i, code in enumerate(inline_codes):
-        # 转义代码内容中的 HTML
-        escaped = code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        text = text.replace(f"\x00IC{i}\x00", f"<code>{escaped}</code>")
+    def restore_code_block(m: re.Match) -> str:
+        return restore(m) if m.group(1) == "CB" else m.group(0)
     
-    # 12. 使用 HTML 标签恢复代码块
-    for i, code in enumerate(code_blocks):
-        # 转义代码内容中的 HTML
-        escaped = code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        text = text.replace(f"\x00CB{i}\x00", f"<pre><code>{escaped}</code></pre>")
+    if inline_codes or code_blocks:
+        text = _RE_PLACEHOLDER.sub(restore, text)
     
     return text
 
@@ -90,7 +146,12 @@ class TelegramChannel(BaseChannel):
         self.config: TelegramConfig = config
         self.groq_api_key = groq_api_key
         self._app: Application | None = None
-        self._chat_ids: dict[str, int] = {}  # 将 sender_id 映射到 chat_id 以进行回复
+        # 将 sender_id 映射到 chat_id 以进行回复（LRU，最多 CHAT_ID_CACHE_SIZE 条）
+        self._chat_ids: OrderedDict[str, int] = OrderedDict()
+        self._pending: dict[int, list[str]] = {}  # 按 chat_id 缓存的待发送消息
+        self._flush_tasks: dict[int, asyncio.Task[None]] = {}
+        self._media_dir = Path.home() / ".nanobot" / "media"  # 下载的媒体文件保存位置
+        self._transcriber: GroqTranscriptionProvider | None = None
     
     async def start(self) -> None:
         """使用长轮询启动 Telegram 机器人。"""
@@ -99,6 +160,7 @@ class TelegramChannel(BaseChannel):
             return
         
         self._running = True
+        self._media_dir.mkdir(parents=True, exist_ok=True)
         
         # 构建应用
         self._app = (
@@ -144,6 +206,15 @@ class TelegramChannel(BaseChannel):
         """停止 Telegram 机器人。"""
         self._running = False
         
+        # 等待合并窗口中的消息发送完毕（不取消，避免丢掉正在发送的批次）
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks.values(), return_exceptions=True)
+        for chat_id in list(self._pending):
+            await self._flush(chat_id)
+        
+        if self._transcriber:
+            await self._transcriber.aclose()
+        
         if self._app:
             logger.info("正在停止 Telegram 机器人...")
             await self._app.updater.stop()
@@ -152,30 +223,78 @@ class TelegramChannel(BaseChannel):
             self._app = None
     
     async def send(self, msg: OutboundMessage) -> None:
-        """通过 Telegram 发送消息。"""
+        """
+        通过 Telegram 发送消息。
+        
+        同一聊天在 SEND_COALESCE_DELAY 窗口内的多条消息会合并发送，以减少 API 往返和限流。
+        """
         if not self._app:
             logger.warning("Telegram 机器人未运行")
             return
         
+        # chat_id 应该是 Telegram 聊天 ID（整数），只解析一次
         try:
-            # chat_id 应该是 Telegram 聊天 ID（整数）
             chat_id = int(msg.chat_id)
+        except ValueError:
+            logger.error(f"无效的 chat_id：{msg.chat_id}")
+            return
+        
+        self._pending.setdefault(chat_id, []).append(msg.content)
+        if chat_id not in self._flush_tasks:
+            self._flush_tasks[chat_id] = asyncio.create_task(self._flush_after(chat_id))
+    
+    async def _flush_after(self, chat_id: int) -> None:
+        """
+        等待合并窗口结束后发送该聊天的待发送消息。
+        
+        每个聊天同一时间只有一个该任务：发送期间到达的消息留在 _pending 中，
+        由本任务在当前批次发送完成后继续处理，保证消息按顺序送达。
+        """
+        try:
+            while chat_id in self._pending:
+                await asyncio.sleep(SEND_COALESCE_DELAY)
+                await self._flush(chat_id)
+        finally:
+            self._flush_tasks.pop(chat_id, None)
+    
+    async def _flush(self, chat_id: int) -> None:
+        """将待发送消息按长度上限拼接后发送。"""
+        contents = self._pending.pop(chat_id, None)
+        if not contents:
+            return
+        
+        batch: list[str] = []
+        size = 0
+        for content in contents:
+            if batch and size + len(content) + 2 > SEND_COALESCE_MAX_CHARS:
+                await self._send_text(chat_id, "\n\n".join(batch))
+                batch, size = [], 0
+            batch.append(content)
+            size += len(content) + 2
+        if batch:
+            await self._send_text(chat_id, "\n\n".join(batch))
+    
+    async def _send_text(self, chat_id: int, text: str) -> None:
+        """发送一条文本消息，HTML 解析失败时回退到纯文本。"""
+        if not self._app:
+            logger.warning("Telegram 机器人未运行")
+            return
+        
+        try:
             # 将 markdown 转换为 Telegram HTML
-            html_content = _markdown_to_telegram_html(msg.content)
+            html_content = _markdown_to_telegram_html(text)
             await self._app.bot.send_message(
                 chat_id=chat_id,
                 text=html_content,
                 parse_mode="HTML"
             )
-        except ValueError:
-            logger.error(f"无效的 chat_id：{msg.chat_id}")
         except Exception as e:
             # 如果 HTML 解析失败则回退到纯文本
             logger.warning(f"HTML 解析失败，回退到纯文本：{e}")
             try:
                 await self._app.bot.send_message(
-                    chat_id=int(msg.chat_id),
-                    text=msg.content
+                    chat_id=chat_id,
+                    text=text
                 )
             except Exception as e2:
                 logger.error(f"发送 Telegram 消息时出错：{e2}")
@@ -207,6 +326,9 @@ class TelegramChannel(BaseChannel):
         
         # 存储 chat_id 用于回复
         self._chat_ids[sender_id] = chat_id
+        self._chat_ids.move_to_end(sender_id)
+        if len(self._chat_ids) > CHAT_ID_CACHE_SIZE:
+            self._chat_ids.popitem(last=False)
         
         # 从文本和/或媒体构建内容
         content_parts = []
@@ -222,18 +344,10 @@ class TelegramChannel(BaseChannel):
         media_file = None
         media_type = None
         
-        if message.photo:
-            media_file = message.photo[-1]  # 最大的照片
-            media_type = "image"
-        elif message.voice:
-            media_file = message.voice
-            media_type = "voice"
-        elif message.audio:
-            media_file = message.audio
-            media_type = "audio"
-        elif message.document:
-            media_file = message.document
-            media_type = "file"
+        for attr, mtype, getter in _MEDIA_ACCESSORS:
+            if getattr(message, attr):
+                media_file, media_type = getter(message), mtype
+                break
         
         # 如果存在则下载媒体
         if media_file and self._app:
@@ -241,21 +355,15 @@ class TelegramChannel(BaseChannel):
                 file = await self._app.bot.get_file(media_file.file_id)
                 ext = self._get_extension(media_type, getattr(media_file, 'mime_type', None))
                 
-                # 保存到 workspace/media/
-                from pathlib import Path
-                media_dir = Path.home() / ".nanobot" / "media"
-                media_dir.mkdir(parents=True, exist_ok=True)
-                
-                file_path = media_dir / f"{media_file.file_id[:16]}{ext}"
+                # 保存到 ~/.nanobot/media/（目录在 start() 中创建）
+                file_path = self._media_dir / f"{media_file.file_id[:16]}{ext}"
                 await file.download_to_drive(str(file_path))
                 
                 media_paths.append(str(file_path))
                 
-                # 处理语音转录
-                if media_type == "voice" or media_type == "audio":
-                    from nanobot.providers.transcription import GroqTranscriptionProvider
-                    transcriber = GroqTranscriptionProvider(api_key=self.groq_api_key)
-                    transcription = await transcriber.transcribe(file_path)
+                # 处理语音转录（未配置 Groq 密钥时直接跳过）
+                if media_type in ("voice", "audio") and self._get_transcriber().api_key:
+                    transcription = await self._get_transcriber().transcribe(file_path)
                     if transcription:
                         logger.info(f"转录 {media_type}：{transcription[:50]}...")
                         content_parts.append(f"[转录：{transcription}]")
@@ -288,15 +396,12 @@ class TelegramChannel(BaseChannel):
             }
         )
     
+    def _get_transcriber(self) -> GroqTranscriptionProvider:
+        """获取（按需创建）在多条消息间复用的转录提供商。"""
+        if self._transcriber is None:
+            self._transcriber = GroqTranscriptionProvider(api_key=self.groq_api_key)
+        return self._transcriber
+    
     def _get_extension(self, media_type: str, mime_type: str | None) -> str:
         """根据媒体类型获取文件扩展名。"""
-        if mime_type:
-            ext_map = {
-                "image/jpeg": ".jpg", "image/png": ".png", "image/gif": ".gif",
-                "audio/ogg": ".ogg", "audio/mpeg": ".mp3", "audio/mp4": ".m4a",
-            }
-            if mime_type in ext_map:
-                return ext_map[mime_type]
-        
-        type_map = {"image": ".jpg", "voice": ".ogg", "audio": ".mp3", "file": ""}
-        return type_map.get(media_type, "")
+        return _MIME_EXT.get(mime_type) or _TYPE_EXT.get(media_type, "")
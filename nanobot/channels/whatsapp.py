@@ -1,9 +1,10 @@
 """使用 Node.js 桥的 WhatsApp 频道实现。"""
 
 import asyncio
-import json
+import random
 from typing import Any
 
+import orjson
 from loguru import logger
 
 from nanobot.bus.events import OutboundMessage
@@ -11,6 +12,13 @@ from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import WhatsAppConfig
 
+# 桥断开后重连的初始和最大等待时间（秒）
+RECONNECT_INITIAL_DELAY = 1.0
+RECONNECT_MAX_DELAY = 60.0
+
+# 同时处理的桥消息数上限
+MAX_CONCURRENT_HANDLERS = 64
+
 
 class WhatsAppChannel(BaseChannel):
     """
@@ -27,6 +35,8 @@ class WhatsAppChannel(BaseChannel):
         self.config: WhatsAppConfig = config
         self._ws = None
         self._connected = False
+        self._handler_sem = asyncio.Semaphore(MAX_CONCURRENT_HANDLERS)
+        self._handler_tasks: set[asyncio.Task[None]] = set()  # 持有处理任务的引用，防止被回收
     
     async def start(self) -> None:
         """通过连接到桥启动 WhatsApp 频道。"""
@@ -37,20 +47,21 @@ class WhatsAppChannel(BaseChannel):
         logger.info(f"正在连接到 {bridge_url} 的 WhatsApp 桥...")
         
         self._running = True
+        backoff = RECONNECT_INITIAL_DELAY
         
         while self._running:
             try:
                 async with websockets.connect(bridge_url) as ws:
                     self._ws = ws
                     self._connected = True
+                    backoff = RECONNECT_INITIAL_DELAY
                     logger.info("已连接到 WhatsApp 桥")
                     
-                    # 监听消息
+                    # 监听消息，每条消息在独立任务中处理，慢速处理不会阻塞读取
                     async for message in ws:
-                        try:
-                            await self._handle_bridge_message(message)
-                        except Exception as e:
-                            logger.error(f"处理桥消息时出错：{e}")
+                        task = asyncio.create_task(self._run_handler(message))
+                        self._handler_tasks.add(task)
+                        task.add_done_callback(self._handler_tasks.discard)
                     
             except asyncio.CancelledError:
                 break
@@ -60,8 +71,19 @@ class WhatsAppChannel(BaseChannel):
                 logger.warning(f"WhatsApp 桥连接错误：{e}")
                 
                 if self._running:
-                    logger.info("5 秒后重新连接...")
-                    await asyncio.sleep(5)
+                    # 指数退避加随机抖动，避免桥故障时大量客户端同时重连
+                    delay = min(backoff + random.random(), RECONNECT_MAX_DELAY)
+                    logger.info(f"{delay:.1f} 秒后重新连接...")
+                    await asyncio.sleep(delay)
+                    backoff = min(backoff * 2, RECONNECT_MAX_DELAY)
+    
+    async def _run_handler(self, message: str | bytes) -> None:
+        """在并发上限内处理一条桥消息。"""
+        async with self._handler_sem:
+            try:
+                await self._handle_bridge_message(message)
+            except Exception as e:
+                logger.error(f"处理桥消息时出错：{e}")
     
     async def stop(self) -> None:
         """停止 WhatsApp 频道。"""
@@ -84,15 +106,16 @@ class WhatsAppChannel(BaseChannel):
                 "to": msg.chat_id,
                 "text": msg.content
             }
-            await self._ws.send(json.dumps(payload))
+            # 以二进制帧发送 UTF-8 JSON，桥端通过 data.toString() 解析
+            await self._ws.send(orjson.dumps(payload))
         except Exception as e:
             logger.error(f"发送 WhatsApp 消息时出错：{e}")
     
-    async def _handle_bridge_message(self, raw: str) -> None:
+    async def _handle_bridge_message(self, raw: str | bytes) -> None:
         """处理来自桥的消息。"""
         try:
-            data = json.loads(raw)
-        except json.JSONDecodeError:
+            data = orjson.loads(raw)
+        except orjson.JSONDecodeError:
             logger.warning(f"来自桥的无效 JSON：{raw[:100]}")
             return
         
@@ -1,6 +1,8 @@
 """nanobot 的 CLI 命令。"""
 
 import asyncio
+import functools
+import sys
 from pathlib import Path
 
 import typer
@@ -210,6 +212,7 @@ def gateway(
         exec_config=config.tools.exec,
         cron_service=cron,
         restrict_to_workspace=config.tools.restrict_to_workspace,
+        subagent_config=config.agents.subagents,
     )
     
     # 设置 cron 回调（需要代理）
@@ -258,6 +261,9 @@ def gateway(
     console.print(f"[green]✓[/green] 心跳：每 30 分钟")
     
     async def run():
+        # Python 3.12+：新任务立即开始执行，频道启动等 I/O 可以更早重叠
+        if sys.version_info >= (3, 12):
+            asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
         try:
             await cron.start()
             await heartbeat.start()
@@ -271,6 +277,8 @@ def gateway(
             cron.stop()
             agent.stop()
             await channels.stop_all()
+        finally:
+            await provider.aclose()
     
     asyncio.run(run())
 
@@ -318,13 +326,17 @@ def agent(
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
         restrict_to_workspace=config.tools.restrict_to_workspace,
+        subagent_config=config.agents.subagents,
     )
     
     if message:
         # 单条消息模式
         async def run_once():
-            response = await agent_loop.process_direct(message, session_id)
-            console.print(f"\n{__logo__} {response}")
+            try:
+                response = await agent_loop.process_direct(message, session_id)
+                console.print(f"\n{__logo__} {response}")
+            finally:
+                await provider.aclose()
         
         asyncio.run(run_once())
     else:
@@ -332,17 +344,20 @@ def agent(
         console.print(f"{__logo__} 交互模式（Ctrl+C 退出）\n")
         
         async def run_interactive():
-            while True:
-                try:
-                    user_input = console.input("[bold blue]你：[/bold blue] ")
-                    if not user_input.strip():
-                        continue
-                    
-                    response = await agent_loop.process_direct(user_input, session_id)
-                    console.print(f"\n{__logo__} {response}\n")
-                except KeyboardInterrupt:
-                    console.print("\n再见！")
-                    break
+            try:
+                while True:
+                    try:
+                        user_input = console.input("[bold blue]你：[/bold blue] ")
+                        if not user_input.strip():
+                            continue
+                        
+                        response = await agent_loop.process_direct(user_input, session_id)
+                        console.print(f"\n{__logo__} {response}\n")
+                    except KeyboardInterrupt:
+                        console.print("\n再见！")
+                        break
+            finally:
+                await provider.aclose()
         
         asyncio.run(run_interactive())
 
@@ -397,10 +412,17 @@ def channels_status():
     console.print(table)
 
 
+# 桥源码位置：nanobot/bridge（已安装）和 repo root/bridge（开发）
+_PKG_BRIDGE = Path(__file__).resolve().parent.parent / "bridge"
+_SRC_BRIDGE = _PKG_BRIDGE.parent.parent / "bridge"
+
+
+@functools.lru_cache(maxsize=1)
 def _get_bridge_dir() -> Path:
-    """获取桥目录，如果需要则进行设置。"""
+    """获取桥目录，如果需要则进行设置（结果在进程内缓存）。"""
     import shutil
     import subprocess
+    from concurrent.futures import ThreadPoolExecutor
     
     # 用户的桥位置
     user_bridge = Path.home() / ".nanobot" / "bridge"
@@ -415,14 +437,11 @@ def _get_bridge_dir() -> Path:
         raise typer.Exit(1)
     
     # 查找源桥：首先检查包数据，然后检查源目录
-    pkg_bridge = Path(__file__).parent.parent / "bridge"  # nanobot/bridge（已安装）
-    src_bridge = Path(__file__).parent.parent.parent / "bridge"  # repo root/bridge（开发）
-    
     source = None
-    if (pkg_bridge / "package.json").exists():
-        source = pkg_bridge
-    elif (src_bridge / "package.json").exists():
-        source = src_bridge
+    if (_PKG_BRIDGE / "package.json").exists():
+        source = _PKG_BRIDGE
+    elif (_SRC_BRIDGE / "package.json").exists():
+        source = _SRC_BRIDGE
     
     if not source:
         console.print("[red]未找到桥源。[/red]")
@@ -431,16 +450,33 @@ def _get_bridge_dir() -> Path:
     
     console.print(f"{__logo__} 正在设置桥...")
     
-    # 复制到用户目录
+    # 删除旧的桥目录（可能包含很大的 node_modules），同时检查 npm 能否正常运行
     user_bridge.parent.mkdir(parents=True, exist_ok=True)
-    if user_bridge.exists():
-        shutil.rmtree(user_bridge)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        removal = pool.submit(shutil.rmtree, user_bridge) if user_bridge.exists() else None
+        npm_check = pool.submit(subprocess.run, ["npm", "--version"], capture_output=True)
+    if removal:
+        try:
+            removal.result()
+        except OSError as e:
+            console.print(f"[red]无法删除旧的桥目录 {user_bridge}：{e}[/red]")
+            raise typer.Exit(1)
+    if npm_check.result().returncode != 0:
+        console.print("[red]npm 无法运行。请检查 Node.js 安装。[/red]")
+        raise typer.Exit(1)
+    
+    # 复制到用户目录
     shutil.copytree(source, user_bridge, ignore=shutil.ignore_patterns("node_modules", "dist"))
     
     # 安装和构建
     try:
         console.print("  正在安装依赖...")
-        subprocess.run(["npm", "install"], cwd=user_bridge, check=True, capture_output=True)
+        # 有 lock 文件时使用更快且可复现的 npm ci；跳过审计和资助提示，优先使用本地缓存
+        install = "ci" if (user_bridge / "package-lock.json").exists() else "install"
+        subprocess.run(
+            ["npm", install, "--prefer-offline", "--no-audit", "--no-fund", "--loglevel=error"],
+            cwd=user_bridge, check=True, capture_output=True,
+        )
         
         console.print("  正在构建...")
         subprocess.run(["npm", "run", "build"], cwd=user_bridge, check=True, capture_output=True)
@@ -644,27 +680,32 @@ def status():
     config = load_config()
     workspace = config.workspace_path
 
-    console.print(f"{__logo__} nanobot 状态\n")
-    console.print(f"配置：{config_path} {'[green]✓[/green]' if config_path.exists() else '[red]✗[/red]'}")
-    console.print(f"工作区：{workspace} {'[green]✓[/green]' if workspace.exists() else '[red]✗[/red]'}")
+    ok = "[green]✓[/green]"
+    config_exists = config_path.exists()
 
-    if config_path.exists():
-        console.print(f"模型：{config.agents.defaults.model}")
+    # 一次性构建整个状态表并输出
+    table = Table(title=f"{__logo__} nanobot 状态", title_justify="left", show_header=False, box=None)
+    table.add_column("设置")
+    table.add_column("值")
+    table.add_row("配置", f"{config_path} {ok if config_exists else '[red]✗[/red]'}")
+    table.add_row("工作区", f"{workspace} {ok if workspace.exists() else '[red]✗[/red]'}")
+
+    if config_exists:
+        providers = config.providers
+        table.add_row("模型", config.agents.defaults.model)
         
         # 检查 API 密钥
-        has_openrouter = bool(config.providers.openrouter.api_key)
-        has_anthropic = bool(config.providers.anthropic.api_key)
-        has_openai = bool(config.providers.openai.api_key)
-        has_gemini = bool(config.providers.gemini.api_key)
-        has_vllm = bool(config.providers.vllm.api_base)
-        
-        console.print(f"OpenRouter API：{'[green]✓[/green]' if has_openrouter else '[dim]未设置[/dim]'}")
-        console.print(f"Anthropic API：{'[green]✓[/green]' if has_anthropic else '[dim]未设置[/dim]'}")
-        console.print(f"OpenAI API：{'[green]✓[/green]' if has_openai else '[dim]未设置[/dim]'}")
-        console.print(f"Gemini API：{'[green]✓[/green]' if has_gemini else '[dim]未设置[/dim]'}")
-        vllm_status = f"[green]✓ {config.providers.vllm.api_base}[/green]" if has_vllm else "[dim]未设置[/dim]"
-        console.print(f"vLLM/本地：{vllm_status}")
+        for label, provider in (
+            ("OpenRouter API", providers.openrouter),
+            ("Anthropic API", providers.anthropic),
+            ("OpenAI API", providers.openai),
+            ("Gemini API", providers.gemini),
+        ):
+            table.add_row(label, ok if provider.api_key else "[dim]未设置[/dim]")
+        vllm_base = providers.vllm.api_base
+        table.add_row("vLLM/本地", f"[green]✓ {vllm_base}[/green]" if vllm_base else "[dim]未设置[/dim]")
 
+    console.print(table)
 
 if __name__ == "__main__":
     app()
@@ -18,10 +18,21 @@ def get_data_dir() -> Path:
     return get_data_path()
 
 
+# 已加载的配置：路径 -> (mtime_ns, size, 配置)，文件未变化时直接复用
+_config_cache: dict[Path, tuple[int, int, Config]] = {}
+
+
+def clear_config_cache() -> None:
+    """清空 load_config 的缓存（测试或外部修改配置文件后使用）。"""
+    _config_cache.clear()
+
+
 def load_config(config_path: Path | None = None) -> Config:
     """
     从文件加载配置或创建默认配置。
     
+    同一进程内重复加载未修改的配置文件时返回缓存的同一个对象，调用方不应修改它。
+    
     参数:
         config_path: 可选的配置文件路径。如果未提供则使用默认路径。
     
@@ -30,12 +41,22 @@ def load_config(config_path: Path | None = None) -> Config:
     """
     path = config_path or get_config_path()
     
-    if path.exists():
+    try:
+        st = path.stat()
+    except OSError:
+        st = None
+    
+    if st is not None:
+        cached = _config_cache.get(path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
         try:
             with open(path) as f:
                 data = json.load(f)
             data = _migrate_config(data)
-            return Config.model_validate(convert_keys(data))
+            config = Config.model_validate(convert_keys(data))
+            _config_cache[path] = (st.st_mtime_ns, st.st_size, config)
+            return config
         except (json.JSONDecodeError, ValueError) as e:
             print(f"警告：无法从 {path} 加载配置：{e}")
             print("使用默认配置。")
@@ -53,6 +74,7 @@ def save_config(config: Config, config_path: Path | None = None) -> None:
     """
     path = config_path or get_config_path()
     path.parent.mkdir(parents=True, exist_ok=True)
+    _config_cache.pop(path, None)
     
     # 转换为 camelCase 格式
     data = config.model_dump()
@@ -1,12 +1,15 @@
 """使用 Pydantic 的配置模式定义。"""
 
+import re
+from operator import attrgetter
 from pathlib import Path
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic_settings import BaseSettings
 
 
 class WhatsAppConfig(BaseModel):
     """WhatsApp 频道配置。"""
+    model_config = ConfigDict(frozen=True)
     enabled: bool = False
     bridge_url: str = "ws://localhost:3001"
     allow_from: list[str] = Field(default_factory=list)  # 允许的电话号码
@@ -14,6 +17,7 @@ class WhatsAppConfig(BaseModel):
 
 class TelegramConfig(BaseModel):
     """Telegram 频道配置。"""
+    model_config = ConfigDict(frozen=True)
     enabled: bool = False
     token: str = ""  # 从 @BotFather 获取的机器人令牌
     allow_from: list[str] = Field(default_factory=list)  # 允许的用户 ID 或用户名
@@ -22,6 +26,7 @@ class TelegramConfig(BaseModel):
 
 class FeishuConfig(BaseModel):
     """飞书/Lark 频道配置，使用 WebSocket 长连接。"""
+    model_config = ConfigDict(frozen=True)
     enabled: bool = False
     app_id: str = ""  # 从飞书开放平台获取的 App ID
     app_secret: str = ""  # 从飞书开放平台获取的 App Secret
@@ -32,6 +37,7 @@ class FeishuConfig(BaseModel):
 
 class DiscordConfig(BaseModel):
     """Discord 频道配置。"""
+    model_config = ConfigDict(frozen=True)
     enabled: bool = False
     token: str = ""  # 从 Discord 开发者门户获取的机器人令牌
     allow_from: list[str] = Field(default_factory=list)  # 允许的用户 ID
@@ -41,6 +47,7 @@ class DiscordConfig(BaseModel):
 
 class ChannelsConfig(BaseModel):
     """聊天频道配置。"""
+    model_config = ConfigDict(frozen=True)
     whatsapp: WhatsAppConfig = Field(default_factory=WhatsAppConfig)
     telegram: TelegramConfig = Field(default_factory=TelegramConfig)
     discord: DiscordConfig = Field(default_factory=DiscordConfig)
@@ -49,6 +56,7 @@ class ChannelsConfig(BaseModel):
 
 class AgentDefaults(BaseModel):
     """代理默认配置。"""
+    model_config = ConfigDict(frozen=True)
     workspace: str = "~/.nanobot/workspace"
     model: str = "anthropic/claude-opus-4-5"
     max_tokens: int = 8192
@@ -56,19 +64,31 @@ class AgentDefaults(BaseModel):
     max_tool_iterations: int = 20
 
 
+class SubagentConfig(BaseModel):
+    """子代理配置。"""
+    model_config = ConfigDict(frozen=True)
+    max_concurrency: int = 8  # 同时运行的子代理上限，超出的任务排队等待
+    announce_delay_ms: int = 100  # 合并同一会话子代理结果通知的窗口，0 表示立即通知
+    jit_planning: bool = False  # 启动时先用一次规划调用直接执行可预先确定的工具步骤
+
+
 class AgentsConfig(BaseModel):
     """代理配置。"""
+    model_config = ConfigDict(frozen=True)
     defaults: AgentDefaults = Field(default_factory=AgentDefaults)
+    subagents: SubagentConfig = Field(default_factory=SubagentConfig)
 
 
 class ProviderConfig(BaseModel):
     """LLM 提供商配置。"""
+    model_config = ConfigDict(frozen=True)
     api_key: str = ""
     api_base: str | None = None
 
 
 class ProvidersConfig(BaseModel):
     """LLM 提供商配置。"""
+    model_config = ConfigDict(frozen=True)
     anthropic: ProviderConfig = Field(default_factory=ProviderConfig)
     openai: ProviderConfig = Field(default_factory=ProviderConfig)
     openrouter: ProviderConfig = Field(default_factory=ProviderConfig)
@@ -83,33 +103,67 @@ class ProvidersConfig(BaseModel):
 
 class GatewayConfig(BaseModel):
     """网关/服务器配置。"""
+    model_config = ConfigDict(frozen=True)
     host: str = "0.0.0.0"
     port: int = 18790
 
 
 class WebSearchConfig(BaseModel):
     """网页搜索工具配置。"""
+    model_config = ConfigDict(frozen=True)
     api_key: str = ""  # Brave Search API 密钥
     max_results: int = 5
 
 
 class WebToolsConfig(BaseModel):
     """Web 工具配置。"""
+    model_config = ConfigDict(frozen=True)
     search: WebSearchConfig = Field(default_factory=WebSearchConfig)
 
 
 class ExecToolConfig(BaseModel):
     """Shell 执行工具配置。"""
+    model_config = ConfigDict(frozen=True)
     timeout: int = 60
 
 
 class ToolsConfig(BaseModel):
     """工具配置。"""
+    model_config = ConfigDict(frozen=True)
     web: WebToolsConfig = Field(default_factory=WebToolsConfig)
     exec: ExecToolConfig = Field(default_factory=ExecToolConfig)
     restrict_to_workspace: bool = False  # 如果为 true，限制所有工具访问工作区目录
 
 
+# 模型名称关键词到提供商字段的映射（按匹配优先级排列）
+_PROVIDER_KEYWORDS: dict[str, str] = {
+    "openrouter": "openrouter",
+    "deepseek": "deepseek",
+    "anthropic": "anthropic",
+    "claude": "anthropic",
+    "openai": "openai",
+    "gpt": "openai",
+    "gemini": "gemini",
+    "zhipu": "zhipu",
+    "glm": "zhipu",
+    "zai": "zhipu",
+    "dashscope": "dashscope",
+    "qwen": "dashscope",
+    "groq": "groq",
+    "moonshot": "moonshot",
+    "kimi": "moonshot",
+    "vllm": "vllm",
+}
+# 使用前瞻断言以便找出所有（包括相互重叠的）关键词
+_PROVIDER_RE = re.compile("(?=(" + "|".join(map(re.escape, _PROVIDER_KEYWORDS)) + "))")
+
+# get_api_key 回退时查找可用密钥的提供商顺序；attrgetter 一次调用返回有序元组
+_fallback_providers = attrgetter(
+    "openrouter", "deepseek", "anthropic", "openai", "gemini",
+    "zhipu", "dashscope", "moonshot", "vllm", "groq",
+)
+
+
 class Config(BaseSettings):
     """nanobot 的根配置。"""
     agents: AgentsConfig = Field(default_factory=AgentsConfig)
@@ -126,28 +180,15 @@ class Config(BaseSettings):
     def _match_provider(self, model: str | None = None) -> ProviderConfig | None:
         """根据模型名称匹配提供商。"""
         model = (model or self.agents.defaults.model).lower()
-        # 关键词到提供商配置的映射
-        providers = {
-            "openrouter": self.providers.openrouter,
-            "deepseek": self.providers.deepseek,
-            "anthropic": self.providers.anthropic,
-            "claude": self.providers.anthropic,
-            "openai": self.providers.openai,
-            "gpt": self.providers.openai,
-            "gemini": self.providers.gemini,
-            "zhipu": self.providers.zhipu,
-            "glm": self.providers.zhipu,
-            "zai": self.providers.zhipu,
-            "dashscope": self.providers.dashscope,
-            "qwen": self.providers.dashscope,
-            "groq": self.providers.groq,
-            "moonshot": self.providers.moonshot,
-            "kimi": self.providers.moonshot,
-            "vllm": self.providers.vllm,
-        }
-        for keyword, provider in providers.items():
-            if keyword in model and provider.api_key:
-                return provider
+        # 一次正则扫描找出模型名中出现的所有关键词，再按优先级挑选已配置密钥的提供商
+        found = set(_PROVIDER_RE.findall(model))
+        if not found:
+            return None
+        for keyword, attr in _PROVIDER_KEYWORDS.items():
+            if keyword in found:
+                provider = getattr(self.providers, attr)
+                if provider.api_key:
+                    return provider
         return None
 
     def get_api_key(self, model: str | None = None) -> str | None:
@@ -157,23 +198,14 @@ class Config(BaseSettings):
         if matched:
             return matched.api_key
         # 回退：返回第一个可用的密钥
-        for provider in [
-            self.providers.openrouter, self.providers.deepseek,
-            self.providers.anthropic, self.providers.openai,
-            self.providers.gemini, self.providers.zhipu,
-            self.providers.dashscope, self.providers.moonshot,
-            self.providers.vllm, self.providers.groq,
-        ]:
-            if provider.api_key:
-                return provider.api_key
-        return None
+        return next((p.api_key for p in _fallback_providers(self.providers) if p.api_key), None)
     
     def get_api_base(self, model: str | None = None) -> str | None:
         """根据模型名称获取 API 基础 URL。"""
         model = (model or self.agents.defaults.model).lower()
         if "openrouter" in model:
             return self.providers.openrouter.api_base or "https://openrouter.ai/api/v1"
-        if any(k in model for k in ("zhipu", "glm", "zai")):
+        if "zhipu" in model or "glm" in model or "zai" in model:
             return self.providers.zhipu.api_base
         if "vllm" in model:
             return self.providers.vllm.api_base
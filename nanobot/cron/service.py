@@ -1,12 +1,13 @@
 """用于调度代理任务的定时任务服务。"""
 
 import asyncio
-import json
+import os
 import time
 import uuid
 from pathlib import Path
 from typing import Any, Callable, Coroutine
 
+import orjson
 from loguru import logger
 
 from nanobot.cron.types import CronJob, CronJobState, CronPayload, CronSchedule, CronStore
@@ -60,7 +61,8 @@ class CronService:
         
         if self.store_path.exists():
             try:
-                data = json.loads(self.store_path.read_text())
+                with open(self.store_path, "rb") as f:
+                    data = orjson.loads(f.read())
                 jobs = []
                 for j in data.get("jobs", []):
                     jobs.append(CronJob(
@@ -142,7 +144,12 @@ class CronService:
             ]
         }
         
-        self.store_path.write_text(json.dumps(data, indent=2))
+        # 一次序列化为字节，写入临时文件后原子替换，避免中断时留下不完整的 jobs.json
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        tmp_path = self.store_path.with_name(f".{self.store_path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, self.store_path)
     
     async def start(self) -> None:
         """启动定时任务服务。"""
@@ -4,7 +4,7 @@ from dataclasses import dataclass, field
 from typing import Literal
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CronSchedule:
     """定时任务的调度定义。"""
     kind: Literal["at", "every", "cron"]
@@ -18,7 +18,7 @@ class CronSchedule:
     tz: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CronPayload:
     """任务运行时要执行的操作。"""
     kind: Literal["system_event", "agent_turn"] = "agent_turn"
@@ -29,7 +29,7 @@ class CronPayload:
     to: str | None = None  # 例如电话号码
 
 
-@dataclass
+@dataclass(slots=True)
 class CronJobState:
     """任务的运行时状态。"""
     next_run_at_ms: int | None = None
@@ -38,7 +38,7 @@ class CronJobState:
     last_error: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class CronJob:
     """一个定时任务。"""
     id: str
@@ -52,7 +52,7 @@ class CronJob:
     delete_after_run: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class CronStore:
     """定时任务的持久化存储。"""
     version: int = 1
@@ -1,6 +1,8 @@
 """心跳服务 - 定期唤醒代理检查任务。"""
 
 import asyncio
+import os
+import re
 from pathlib import Path
 from typing import Any, Callable, Coroutine
 
@@ -17,22 +19,38 @@ HEARTBEAT_PROMPT = """读取你工作区中的 HEARTBEAT.md（如果存在）。
 # 表示"无事可做"的令牌
 HEARTBEAT_OK_TOKEN = "HEARTBEAT_OK"
 
+# 在响应中查找该令牌：忽略大小写和字母间的下划线，并允许 HEARTBEAT 与 OK 之间有空白
+_HEARTBEAT_OK_RE = re.compile(
+    "_*".join("HEARTBEAT") + r"[_\s]*" + "_*".join("OK"),
+    re.IGNORECASE,
+)
+
+# 匹配任意可操作的行：跳过空行、标题、HTML 注释和空复选框（- [ ]、* [ ]、- [x]、* [x]）
+_ACTIONABLE_RE = re.compile(
+    r"^(?!\s*$)(?!\s*#)(?!\s*<!--)(?!\s*[-*] \[[ x]\]\s*$).+",
+    re.MULTILINE,
+)
+_ACTIONABLE_BYTES_RE = re.compile(
+    rb"^(?!\s*$)(?!\s*#)(?!\s*<!--)(?!\s*[-*] \[[ x]\]\s*$).+",
+    re.MULTILINE,
+)
+
 
 def _is_heartbeat_empty(content: str | None) -> bool:
     """检查 HEARTBEAT.md 是否有可操作的内容。"""
-    if not content:
-        return True
-    
-    # 要跳过的行：空行、标题、HTML 注释、空复选框
-    skip_patterns = {"- [ ]", "* [ ]", "- [x]", "* [x]"}
-    
-    for line in content.split("\n"):
-        line = line.strip()
-        if not line or line.startswith("#") or line.startswith("<!--") or line in skip_patterns:
-            continue
-        return False  # 找到可操作的内容
+    return not content or not _ACTIONABLE_RE.search(content)
+
+
+def _is_heartbeat_bytes_empty(raw: bytes | None) -> bool:
+    """
+    直接在原始字节上检查 HEARTBEAT.md 是否有可操作的内容。
     
-    return True
+    字节正则只认 ASCII 空白，匹配结果是 _is_heartbeat_empty 的超集：
+    字节层面没有可操作行时文件一定为空，无需解码；否则解码后再精确判断。
+    """
+    if not raw or not _ACTIONABLE_BYTES_RE.search(raw):
+        return True
+    return _is_heartbeat_empty(raw.decode("utf-8", "replace"))
 
 
 class HeartbeatService:
@@ -56,19 +74,36 @@ class HeartbeatService:
         self.enabled = enabled
         self._running = False
         self._task: asyncio.Task | None = None
+        self._wake = asyncio.Event()  # 设置后立即唤醒心跳循环（停止时使用）
+        self._cached: tuple[int, int, bool] | None = None  # (mtime_ns, size, 是否为空)
     
     @property
     def heartbeat_file(self) -> Path:
         return self.workspace / "HEARTBEAT.md"
     
-    def _read_heartbeat_file(self) -> str | None:
-        """读取 HEARTBEAT.md 内容。"""
-        if self.heartbeat_file.exists():
-            try:
-                return self.heartbeat_file.read_text()
-            except Exception:
-                return None
-        return None
+    def _read_heartbeat_file(self) -> bytes | None:
+        """读取 HEARTBEAT.md 的原始字节，文件不存在或无法读取时返回 None。"""
+        try:
+            with open(self.heartbeat_file, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def _has_tasks(self) -> bool:
+        """检查 HEARTBEAT.md 是否有可操作的内容（文件未修改时复用上次的结果）。"""
+        try:
+            st = os.stat(self.heartbeat_file)
+        except OSError:
+            self._cached = None
+            return False
+        
+        key = (st.st_mtime_ns, st.st_size)
+        if self._cached and self._cached[:2] == key:
+            return not self._cached[2]
+        
+        is_empty = _is_heartbeat_bytes_empty(self._read_heartbeat_file())
+        self._cached = (*key, is_empty)
+        return not is_empty
     
     async def start(self) -> None:
         """启动心跳服务。"""
@@ -77,34 +112,52 @@ class HeartbeatService:
             return
         
         self._running = True
+        self._wake.clear()
         self._task = asyncio.create_task(self._run_loop())
         logger.info(f"心跳已启动（每 {self.interval_s} 秒）")
     
     def stop(self) -> None:
         """停止心跳服务。"""
         self._running = False
+        self._wake.set()
         if self._task:
             self._task.cancel()
             self._task = None
     
     async def _run_loop(self) -> None:
-        """主心跳循环。"""
+        """
+        主心跳循环。
+        
+        按单调时钟上的固定截止时间触发，执行心跳的耗时不会累积成漂移；
+        如果执行耗时超过一个间隔，则跳过错过的触发并从当前时间重新计时。
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.interval_s
         while self._running:
             try:
-                await asyncio.sleep(self.interval_s)
+                await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, deadline - loop.time()))
+                break  # 被 stop() 唤醒
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                break
+            
+            try:
                 if self._running:
                     await self._tick()
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"心跳错误：{e}")
+            
+            deadline += self.interval_s
+            if deadline < loop.time():
+                deadline = loop.time() + self.interval_s
     
     async def _tick(self) -> None:
         """执行单次心跳触发。"""
-        content = self._read_heartbeat_file()
-        
         # 如果 HEARTBEAT.md 为空或不存在则跳过
-        if _is_heartbeat_empty(content):
+        if not self._has_tasks():
             logger.debug("心跳：无任务（HEARTBEAT.md 为空）")
             return
         
@@ -115,7 +168,7 @@ class HeartbeatService:
                 response = await self.on_heartbeat(HEARTBEAT_PROMPT)
                 
                 # 检查代理是否说"无事可做"
-                if HEARTBEAT_OK_TOKEN.replace("_", "") in response.upper().replace("_", ""):
+                if _HEARTBEAT_OK_RE.search(response):
                     logger.info("心跳：OK（无需操作）")
                 else:
                     logger.info(f"心跳：已完成任务")
@@ -62,6 +62,22 @@ class LLMProvider(ABC):
         """
         pass
     
+    async def warmup(self) -> None:
+        """
+        预热到提供商的连接（可选）。
+        
+        实现应保证可重复调用；默认不执行任何操作。
+        """
+        return None
+    
+    async def aclose(self) -> None:
+        """
+        释放提供商持有的连接等资源（可选）。
+        
+        实现应保证可重复调用；默认不执行任何操作。
+        """
+        return None
+    
     @abstractmethod
     def get_default_model(self) -> str:
         """获取此提供商的默认模型。"""
@@ -1,13 +1,53 @@
 """LiteLLM 提供商实现，支持多提供商。"""
 
+import functools
 import os
+import re
 from typing import Any
 
-import litellm
-from litellm import acompletion
+import httpx
+import orjson
 
 from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
 
+# litellm 导入耗时较长（会加载大量提供商 SDK），推迟到首次创建提供商时再导入
+_litellm: Any = None
+
+
+def _get_litellm() -> Any:
+    """导入并返回 litellm 模块（只导入一次）。"""
+    global _litellm
+    if _litellm is None:
+        import litellm
+        _litellm = litellm
+    return _litellm
+
+
+# 默认模型名称匹配规则到 API 密钥环境变量的映射（按优先级排列）
+_ENV_KEYS: tuple[tuple[re.Pattern[str], str], ...] = (
+    (re.compile("deepseek"), "DEEPSEEK_API_KEY"),
+    (re.compile("anthropic"), "ANTHROPIC_API_KEY"),
+    (re.compile("openai|gpt"), "OPENAI_API_KEY"),
+    (re.compile("gemini", re.IGNORECASE), "GEMINI_API_KEY"),
+    (re.compile("zhipu|glm|zai"), "ZAI_API_KEY"),
+    (re.compile("dashscope|(?i:qwen)"), "DASHSCOPE_API_KEY"),
+    (re.compile("groq"), "GROQ_API_KEY"),
+    (re.compile("moonshot|kimi"), "MOONSHOT_API_KEY"),
+)
+
+# 模型名称前缀规则：(匹配规则, 要添加的前缀, 已有时跳过的前缀)，按顺序依次应用
+_PREFIX_RULES: tuple[tuple[re.Pattern[str], str, tuple[str, ...]], ...] = (
+    (re.compile("glm|zhipu", re.IGNORECASE), "zai/", ("zhipu/", "zai/", "openrouter/")),
+    (re.compile("qwen|dashscope", re.IGNORECASE), "dashscope/", ("dashscope/", "openrouter/")),
+    # Moonshot/Kimi 需在 vLLM 检查之前处理
+    (re.compile("moonshot|kimi", re.IGNORECASE), "moonshot/", ("moonshot/", "openrouter/")),
+    (re.compile("gemini", re.IGNORECASE), "gemini/", ("gemini/",)),
+)
+# 以上所有规则关键词的合并正则，大多数模型一次扫描即可跳过全部规则
+_PREFIX_FAMILY_RE = re.compile("glm|zhipu|qwen|dashscope|moonshot|kimi|gemini", re.IGNORECASE)
+# 只支持 temperature=1.0 的模型
+_KIMI_K25_RE = re.compile(r"kimi-k2\.5", re.IGNORECASE)
+
 
 class LiteLLMProvider(LLMProvider):
     """
@@ -24,6 +64,7 @@ class LiteLLMProvider(LLMProvider):
     ):
         super().__init__(api_key, api_base)
         self.default_model = default_model
+        self._http_client: httpx.AsyncClient | None = None
         
         # 通过 api_key 前缀或显式 api_base 检测 OpenRouter
         self.is_openrouter = (
@@ -42,30 +83,62 @@ class LiteLLMProvider(LLMProvider):
             elif self.is_vllm:
                 # vLLM/自定义端点 - 使用 OpenAI 兼容 API
                 os.environ["HOSTED_VLLM_API_KEY"] = api_key
-            elif "deepseek" in default_model:
-                os.environ.setdefault("DEEPSEEK_API_KEY", api_key)
-            elif "anthropic" in default_model:
-                os.environ.setdefault("ANTHROPIC_API_KEY", api_key)
-            elif "openai" in default_model or "gpt" in default_model:
-                os.environ.setdefault("OPENAI_API_KEY", api_key)
-            elif "gemini" in default_model.lower():
-                os.environ.setdefault("GEMINI_API_KEY", api_key)
-            elif "zhipu" in default_model or "glm" in default_model or "zai" in default_model:
-                os.environ.setdefault("ZAI_API_KEY", api_key)
-            elif "dashscope" in default_model or "qwen" in default_model.lower():
-                os.environ.setdefault("DASHSCOPE_API_KEY", api_key)
-            elif "groq" in default_model:
-                os.environ.setdefault("GROQ_API_KEY", api_key)
-            elif "moonshot" in default_model or "kimi" in default_model:
-                os.environ.setdefault("MOONSHOT_API_KEY", api_key)
-                os.environ.setdefault("MOONSHOT_API_BASE", api_base or "https://api.moonshot.cn/v1")
-        
+            else:
+                for pattern, env_var in _ENV_KEYS:
+                    if pattern.search(default_model):
+                        os.environ.setdefault(env_var, api_key)
+                        if env_var == "MOONSHOT_API_KEY":
+                            os.environ.setdefault("MOONSHOT_API_BASE", api_base or "https://api.moonshot.cn/v1")
+                        break
+        
+        litellm = _get_litellm()
         if api_base:
             litellm.api_base = api_base
         
+        # 预先绑定不变的参数：对于自定义端点（vLLM 等）直接传递 api_base
+        self._acompletion = (
+            functools.partial(litellm.acompletion, api_base=api_base)
+            if api_base else litellm.acompletion
+        )
+        
         # 禁用 LiteLLM 日志噪音
         litellm.suppress_debug_info = True
     
+    async def warmup(self) -> None:
+        """
+        创建 LiteLLM 共享的 HTTP 连接池，并在配置了 api_base 时预先建立连接。
+        
+        LiteLLM 对 OpenAI 兼容的提供商（OpenAI、OpenRouter、vLLM 等）使用
+        litellm.aclient_session，因此后续所有请求都复用同一个保活连接池。
+        只在首次调用时生效；需在事件循环内调用，使连接池绑定到当前循环。
+        """
+        if self._http_client is not None:
+            return
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=32, keepalive_expiry=60),
+            timeout=httpx.Timeout(600.0, connect=10.0),
+        )
+        litellm = _get_litellm()
+        if litellm.aclient_session is None:
+            litellm.aclient_session = self._http_client
+        
+        if self.api_base:
+            try:
+                # 只为建立 TCP/TLS 连接，响应状态无关紧要
+                await self._http_client.head(self.api_base)
+            except Exception:
+                pass
+    
+    async def aclose(self) -> None:
+        """关闭 warmup 创建的连接池，并从 LiteLLM 中移除对它的引用。"""
+        if self._http_client is None:
+            return
+        litellm = _get_litellm()
+        if litellm.aclient_session is self._http_client:
+            litellm.aclient_session = None
+        await self._http_client.aclose()
+        self._http_client = None
+    
     async def chat(
         self,
         messages: list[dict[str, Any]],
@@ -93,32 +166,12 @@ class LiteLLMProvider(LLMProvider):
         if self.is_openrouter and not model.startswith("openrouter/"):
             model = f"openrouter/{model}"
         
-        # 对于智谱/Z.ai，确保存在前缀
-        # 处理如 "glm-4.7-flash" -> "zai/glm-4.7-flash" 的情况
-        if ("glm" in model.lower() or "zhipu" in model.lower()) and not (
-            model.startswith("zhipu/") or 
-            model.startswith("zai/") or 
-            model.startswith("openrouter/")
-        ):
-            model = f"zai/{model}"
-
-        # 对于 DashScope/通义千问，确保 dashscope/ 前缀
-        if ("qwen" in model.lower() or "dashscope" in model.lower()) and not (
-            model.startswith("dashscope/") or
-            model.startswith("openrouter/")
-        ):
-            model = f"dashscope/{model}"
-
-        # 对于 Moonshot/Kimi，确保 moonshot/ 前缀（在 vLLM 检查之前）
-        if ("moonshot" in model.lower() or "kimi" in model.lower()) and not (
-            model.startswith("moonshot/") or model.startswith("openrouter/")
-        ):
-            model = f"moonshot/{model}"
-
-        # 对于 Gemini，如果尚未存在则确保 gemini/ 前缀
-        if "gemini" in model.lower() and not model.startswith("gemini/"):
-            model = f"gemini/{model}"
-
+        # 为智谱/Z.ai、DashScope、Moonshot、Gemini 模型补全 LiteLLM 前缀
+        # 例如 "glm-4.7-flash" -> "zai/glm-4.7-flash"
+        if _PREFIX_FAMILY_RE.search(model):
+            for pattern, prefix, skip_prefixes in _PREFIX_RULES:
+                if pattern.search(model) and not model.startswith(skip_prefixes):
+                    model = prefix + model
 
         # 对于 vLLM，根据 LiteLLM 文档使用 hosted_vllm/ 前缀
         # 如果用户指定了 openai/ 前缀则转换为 hosted_vllm/
@@ -126,26 +179,26 @@ class LiteLLMProvider(LLMProvider):
             model = f"hosted_vllm/{model}"
         
         # kimi-k2.5 只支持 temperature=1.0
-        if "kimi-k2.5" in model.lower():
+        if _KIMI_K25_RE.search(model):
             temperature = 1.0
 
-        kwargs: dict[str, Any] = {
-            "model": model,
-            "messages": messages,
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-        }
-        
-        # 对于自定义端点（vLLM 等）直接传递 api_base
-        if self.api_base:
-            kwargs["api_base"] = self.api_base
-        
-        if tools:
-            kwargs["tools"] = tools
-            kwargs["tool_choice"] = "auto"
-        
         try:
-            response = await acompletion(**kwargs)
+            if tools:
+                response = await self._acompletion(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    tools=tools,
+                    tool_choice="auto",
+                )
+            else:
+                response = await self._acompletion(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                )
             return self._parse_response(response)
         except Exception as e:
             # 将错误作为内容返回以进行优雅处理
@@ -165,10 +218,9 @@ class LiteLLMProvider(LLMProvider):
                 # 如果需要，从 JSON 字符串解析参数
                 args = tc.function.arguments
                 if isinstance(args, str):
-                    import json
                     try:
-                        args = json.loads(args)
-                    except json.JSONDecodeError:
+                        args = orjson.loads(args)
+                    except orjson.JSONDecodeError:
                         args = {"raw": args}
                 
                 tool_calls.append(ToolCallRequest(
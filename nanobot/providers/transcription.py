@@ -18,6 +18,7 @@ class GroqTranscriptionProvider:
     def __init__(self, api_key: str | None = None):
         self.api_key = api_key or os.environ.get("GROQ_API_KEY")
         self.api_url = "https://api.groq.com/openai/v1/audio/transcriptions"
+        self._client: httpx.AsyncClient | None = None  # 复用连接池，避免每次转录重新握手
     
     async def transcribe(self, file_path: str | Path) -> str:
         """
@@ -39,27 +40,34 @@ class GroqTranscriptionProvider:
             return ""
         
         try:
-            async with httpx.AsyncClient() as client:
-                with open(path, "rb") as f:
-                    files = {
-                        "file": (path.name, f),
-                        "model": (None, "whisper-large-v3"),
-                    }
-                    headers = {
-                        "Authorization": f"Bearer {self.api_key}",
-                    }
-                    
-                    response = await client.post(
-                        self.api_url,
-                        headers=headers,
-                        files=files,
-                        timeout=60.0
-                    )
-                    
-                    response.raise_for_status()
-                    data = response.json()
-                    return data.get("text", "")
+            if self._client is None:
+                self._client = httpx.AsyncClient()
+            with open(path, "rb") as f:
+                files = {
+                    "file": (path.name, f),
+                    "model": (None, "whisper-large-v3"),
+                }
+                headers = {
+                    "Authorization": f"Bearer {self.api_key}",
+                }
+                
+                response = await self._client.post(
+                    self.api_url,
+                    headers=headers,
+                    files=files,
+                    timeout=60.0
+                )
+                
+                response.raise_for_status()
+                data = response.json()
+                return data.get("text", "")
                     
         except Exception as e:
             logger.error(f"Groq 转录错误：{e}")
             return ""
+    
+    async def aclose(self) -> None:
+        """关闭复用的 HTTP 客户端（可重复调用）。"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
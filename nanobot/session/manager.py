@@ -1,17 +1,161 @@
 """会话管理，用于对话历史记录。"""
 
-import json
-from pathlib import Path
-from dataclasses import dataclass, field
+import mmap
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any
+from pathlib import Path
+from typing import Any, Iterator
 
+import orjson
 from loguru import logger
 
-from nanobot.utils.helpers import ensure_dir, safe_filename
+from nanobot.utils.helpers import get_sessions_path, safe_filename
+
+# 内存中最多缓存的会话数，以及会话多久未访问后被换出（秒）
+MAX_CACHED_SESSIONS = 256
+SESSION_CACHE_TTL = 3600.0
+# 重建会话索引时并行读取元数据的线程数
+SCAN_WORKERS = 16
+# 超过该大小（字节）的会话文件用 mmap 读取
+MMAP_THRESHOLD = 1 << 20
+# 只有 updated_at 变化时，索引最多每隔这么久（秒）写回一次
+INDEX_FLUSH_INTERVAL = 30.0
+
+
+def _iter_jsonl(buf: bytes | mmap.mmap) -> Iterator[Any]:
+    """
+    逐行解析 JSONL 字节内容，跳过空行。
+    
+    用 find 定位换行符并通过 memoryview 切片交给 orjson，不会为每行复制字节或构建行列表。
+    """
+    # mmap 关闭前必须释放 memoryview，因此用 with 限定其生命周期
+    with memoryview(buf) as view:
+        pos = 0
+        end = len(buf)
+        while pos < end:
+            nl = buf.find(b"\n", pos)
+            if nl < 0:
+                nl = end
+            if nl > pos:
+                try:
+                    yield orjson.loads(view[pos:nl])
+                except orjson.JSONDecodeError:
+                    if nl == end:
+                        # 没有换行结尾的最后一行是追加写入被中断留下的残行，丢弃即可
+                        if not buf[pos:nl].isspace():
+                            logger.warning("忽略会话文件末尾不完整的一行")
+                        return
+                    if not buf[pos:nl].isspace():
+                        raise
+            pos = nl + 1
+
+
+def _read_jsonl(path: Path) -> tuple[list[Any], bool]:
+    """
+    读取 JSONL 文件中的全部记录。
+    
+    超过 MMAP_THRESHOLD 的文件通过 mmap 按需映射页面解析，不再把整个文件复制到堆上。
+    
+    返回:
+        (记录列表, 文件是否以换行结尾) 元组。
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            buf = f.read()
+            return list(_iter_jsonl(buf)), not buf or buf.endswith(b"\n")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return list(_iter_jsonl(mm)), mm[-1:] == b"\n"
+
+
+def _read_last_timestamp(path: Path) -> str | None:
+    """读取 JSONL 文件最后一条消息的时间戳；没有可用的消息时返回 None。"""
+    try:
+        with open(path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - 65536))
+            tail = f.read()
+        lines = tail.rstrip(b"\n").rsplit(b"\n", 1)
+        # 末尾 64KB 内没有完整的一行时退回到整个文件
+        if len(lines) == 1 and len(tail) < size:
+            records, _ = _read_jsonl(path)
+            last = records[-1] if records else None
+        else:
+            last = orjson.loads(lines[-1]) if lines[-1].strip() else None
+    except Exception:
+        return None
+    if isinstance(last, dict) and isinstance(last.get("timestamp"), str):
+        return last["timestamp"]
+    return None
+
+
+def _atomic_write(path: Path, data: bytes, durable: bool = False) -> None:
+    """先写入同目录下的临时文件再原子替换，中途崩溃也不会留下写了一半的文件。"""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb", buffering=65536) as f:
+        f.write(data)
+        if durable:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _meta_bytes(session: "Session") -> bytes:
+    """序列化会话的元数据文件内容。"""
+    return orjson.dumps({
+        "key": session.key,
+        "created_at": session.created_at.isoformat(),
+        "updated_at": session.updated_at.isoformat(),
+        "metadata": session.metadata
+    })
+
+
+def _meta_state(session: "Session") -> bytes:
+    """
+    序列化决定元数据文件是否需要重写的部分。
+    
+    不含 updated_at：它只随新消息变化，加载时可由最后一条消息的时间戳得到。
+    """
+    return orjson.dumps({
+        "key": session.key,
+        "created_at": session.created_at.isoformat(),
+        "metadata": session.metadata
+    })
+
+
+def _read_session_info(path: Path, has_meta: bool) -> dict[str, Any] | None:
+    """读取单个会话文件的列表信息；无法识别时返回 None。"""
+    try:
+        # 只读取元数据文件；旧格式读取 JSONL 的第一行元数据
+        if has_meta:
+            data = orjson.loads(path.with_suffix(".meta.json").read_bytes())
+        else:
+            with open(path, "rb") as f:
+                first_line = f.readline()
+            if not first_line or first_line.isspace():
+                return None
+            data = orjson.loads(first_line)
+            if data.get("_type") != "metadata":
+                return None
+        
+        info = {
+            # 旧文件没有保存原始键，只能从文件名近似还原
+            "key": data.get("key") or path.stem.replace("_", ":"),
+            "created_at": data.get("created_at"),
+            "updated_at": data.get("updated_at"),
+            "path": str(path)
+        }
+        # 旧格式每次保存都重写元数据行，其 updated_at 可信，记下文件大小；
+        # 元数据文件中的 updated_at 可能滞后，不记大小，交由 list_sessions 从最后一行校正
+        if not has_meta:
+            info["size"] = path.stat().st_size
+        return info
+    except Exception:
+        return None
 
 
-@dataclass
 class Session:
     """
     对话会话。
@@ -19,22 +163,43 @@ class Session:
     以 JSONL 格式存储消息，便于阅读和持久化。
     """
     
-    key: str  # channel:chat_id
-    messages: list[dict[str, Any]] = field(default_factory=list)
-    created_at: datetime = field(default_factory=datetime.now)
-    updated_at: datetime = field(default_factory=datetime.now)
-    metadata: dict[str, Any] = field(default_factory=dict)
+    # 手写 __init__ 配合 __slots__：创建时只取一次当前时间，实例也不再带 __dict__
+    __slots__ = ("key", "messages", "created_at", "updated_at", "metadata", "_ctx")
+    
+    def __init__(
+        self,
+        key: str,
+        messages: list[dict[str, Any]] | None = None,
+        created_at: datetime | None = None,
+        updated_at: datetime | None = None,
+        metadata: dict[str, Any] | None = None,
+    ):
+        now = datetime.now() if created_at is None or updated_at is None else None
+        self.key = key  # channel:chat_id
+        self.messages: list[dict[str, Any]] = [] if messages is None else messages
+        self.created_at: datetime = created_at or now
+        self.updated_at: datetime = updated_at or now
+        self.metadata: dict[str, Any] = {} if metadata is None else metadata
+        # 与 messages 同步的 {role, content} 视图，get_history 直接切片，不再逐次重建字典
+        self._ctx: list[dict[str, Any]] = [
+            {"role": m["role"], "content": m["content"]} for m in self.messages
+        ]
+    
+    def __repr__(self) -> str:
+        return (
+            f"Session(key={self.key!r}, messages={len(self.messages)}, "
+            f"created_at={self.created_at!r}, updated_at={self.updated_at!r})"
+        )
     
     def add_message(self, role: str, content: str, **kwargs: Any) -> None:
         """添加消息到会话。"""
-        msg = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-            **kwargs
-        }
+        now = datetime.now()
+        msg = {"role": role, "content": content, "timestamp": now.isoformat()}
+        if kwargs:
+            msg.update(kwargs)
         self.messages.append(msg)
-        self.updated_at = datetime.now()
+        self._ctx.append({"role": role, "content": content})
+        self.updated_at = now
     
     def get_history(self, max_messages: int = 50) -> list[dict[str, Any]]:
         """
@@ -44,17 +209,14 @@ class Session:
             max_messages: 返回的最大消息数。
         
         返回:
-            LLM 格式的消息列表。
+            LLM 格式的消息列表（浅拷贝，调用方修改不会影响会话内部缓存）。
         """
-        # 获取最近的消息
-        recent = self.messages[-max_messages:] if len(self.messages) > max_messages else self.messages
-        
-        # 转换为 LLM 格式（仅 role 和 content）
-        return [{"role": m["role"], "content": m["content"]} for m in recent]
+        return [dict(m) for m in self._ctx[-max_messages:]]
     
     def clear(self) -> None:
         """清除会话中的所有消息。"""
         self.messages = []
+        self._ctx = []
         self.updated_at = datetime.now()
 
 
@@ -62,19 +224,102 @@ class SessionManager:
     """
     管理对话会话。
     
-    会话以 JSONL 文件形式存储在 sessions 目录中。
+    会话以 JSONL 文件形式存储在 sessions 目录中，每行一条消息，只追加新消息；
+    元数据保存在旁边的 <key>.meta.json 文件中，只在元数据或创建时间变化、或整体重写时更新。
+    所有会话的列表信息汇总在 _index.json 中，list_sessions 只需读取这一个文件；
+    会话增删或创建时间变化时立即写回索引，仅 updated_at 变化时合并延迟写回；
+    索引同时记录会话文件大小，list_sessions 据此发现尚未写回的更新。
     """
     
-    def __init__(self, workspace: Path):
+    def __init__(
+        self,
+        workspace: Path,
+        max_cached_sessions: int = MAX_CACHED_SESSIONS,
+        cache_ttl: float = SESSION_CACHE_TTL,
+    ):
         self.workspace = workspace
-        self.sessions_dir = ensure_dir(Path.home() / ".nanobot" / "sessions")
-        self._cache: dict[str, Session] = {}
+        self.sessions_dir = get_sessions_path()
+        self.max_cached_sessions = max_cached_sessions
+        self.cache_ttl = cache_ttl
+        # 按最近访问排序的 LRU 缓存；超出容量或超过 TTL 的会话写回磁盘后移出内存
+        self._cache: OrderedDict[str, Session] = OrderedDict()
+        self._last_access: dict[str, float] = {}
+        # 会话键 -> (已写入磁盘的消息列表对象, 已写入的消息数, 已写入的元数据状态)，
+        # 用于判断能否只追加新消息、元数据文件是否需要重写
+        self._persisted: dict[str, tuple[list[dict[str, Any]], int, bytes]] = {}
+        # 会话索引（键 -> 列表信息）及其对应的索引文件 (mtime_ns, size)，用于发现其他进程的改动
+        self._index: dict[str, dict[str, Any]] | None = None
+        self._index_stat: tuple[int, int] | None = None
+        # 尚未写回索引文件的条目变化（键 -> {updated_at, size}），以及上次写回索引的时间
+        self._index_pending: dict[str, dict[str, Any]] = {}
+        self._index_written_at = 0.0
     
     def _get_session_path(self, key: str) -> Path:
         """获取会话的文件路径。"""
         safe_key = safe_filename(key.replace(":", "_"))
         return self.sessions_dir / f"{safe_key}.jsonl"
     
+    def _get_meta_path(self, key: str) -> Path:
+        """获取会话元数据文件的路径。"""
+        return self._get_session_path(key).with_suffix(".meta.json")
+    
+    def _get_index_path(self) -> Path:
+        """获取会话索引文件的路径。"""
+        return self.sessions_dir / "_index.json"
+    
+    def _load_index(self) -> dict[str, dict[str, Any]]:
+        """
+        获取会话索引。
+        
+        索引文件未变化时直接使用内存中的副本；文件不存在或损坏时扫描会话目录重建。
+        """
+        path = self._get_index_path()
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            st = None
+        
+        if st is not None and self._index is not None and self._index_stat == (st.st_mtime_ns, st.st_size):
+            return self._index
+        
+        if st is not None:
+            try:
+                self._index = orjson.loads(path.read_bytes())
+                self._index_stat = (st.st_mtime_ns, st.st_size)
+                self._apply_index_pending()
+                return self._index
+            except Exception as e:
+                logger.warning(f"读取会话索引失败，重新扫描：{e}")
+        
+        self._index = self._scan_sessions()
+        self._apply_index_pending()
+        self._write_index()
+        return self._index
+    
+    def _apply_index_pending(self) -> None:
+        """重新读取或重建索引后，补上本进程尚未写回的条目变化。"""
+        for key, changes in self._index_pending.items():
+            if key in self._index:
+                self._index[key].update(changes)
+    
+    def _write_index(self) -> None:
+        """把会话索引原子地写回磁盘。"""
+        path = self._get_index_path()
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(self._index))
+        os.replace(tmp_path, path)
+        st = path.stat()
+        self._index_stat = (st.st_mtime_ns, st.st_size)
+        self._index_pending.clear()
+        self._index_written_at = time.monotonic()
+    
+    def flush(self) -> None:
+        """把延迟的索引更新写回磁盘（例如关闭前调用）。"""
+        if self._index_pending:
+            self._load_index()
+            self._write_index()
+    
     def get_or_create(self, key: str) -> Session:
         """
         获取现有会话或创建新会话。
@@ -86,17 +331,45 @@ class SessionManager:
             会话。
         """
         # 检查缓存
-        if key in self._cache:
-            return self._cache[key]
-        
-        # 尝试从磁盘加载
-        session = self._load(key)
+        session = self._cache.get(key)
         if session is None:
-            session = Session(key=key)
+            # 尝试从磁盘加载
+            session = self._load(key)
+            if session is None:
+                session = Session(key=key)
         
-        self._cache[key] = session
+        self._remember(session)
         return session
     
+    def _remember(self, session: Session) -> None:
+        """把会话放入缓存并标记为最近访问，随后换出过期或超出容量的会话。"""
+        key = session.key
+        now = time.monotonic()
+        self._cache[key] = session
+        self._cache.move_to_end(key)
+        self._last_access[key] = now
+        
+        deadline = now - self.cache_ttl
+        while self._cache:
+            oldest = next(iter(self._cache))
+            if oldest == key:
+                break
+            if len(self._cache) <= self.max_cached_sessions and self._last_access[oldest] > deadline:
+                break
+            self._evict(oldest)
+    
+    def _evict(self, key: str) -> None:
+        """把会话移出缓存；有未保存的改动时先写回磁盘。"""
+        session = self._cache.pop(key)
+        self._last_access.pop(key, None)
+        try:
+            # 已持久化的会话没有改动时 save 是空操作；从未保存的空会话不落盘
+            if key in self._persisted or session.messages or session.metadata:
+                self.save(session)
+        except Exception as e:
+            logger.warning(f"写回会话 {key} 失败：{e}")
+        self._persisted.pop(key, None)
+    
     def _load(self, key: str) -> Session | None:
         """从磁盘加载会话。"""
         path = self._get_session_path(key)
@@ -108,50 +381,178 @@ class SessionManager:
             messages = []
             metadata = {}
             created_at = None
+            updated_at = None
+            
+            records, complete = _read_jsonl(path)
+            for data in records:
+                # 旧格式在 JSONL 第一行保存元数据
+                if data.get("_type") == "metadata":
+                    metadata = data.get("metadata", {})
+                    created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
+                else:
+                    messages.append(data)
+            
+            meta_path = self._get_meta_path(key)
+            if meta_path.exists():
+                data = orjson.loads(meta_path.read_bytes())
+                metadata = data.get("metadata", {})
+                created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
+                updated_at = datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None
             
-            with open(path) as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    data = json.loads(line)
-                    
-                    if data.get("_type") == "metadata":
-                        metadata = data.get("metadata", {})
-                        created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
-                    else:
-                        messages.append(data)
+            # 追加消息时不重写元数据文件，以最后一条消息的时间为准
+            last_ts = messages[-1].get("timestamp") if messages else None
+            if isinstance(last_ts, str):
+                last_at = datetime.fromisoformat(last_ts)
+                if updated_at is None or last_at > updated_at:
+                    updated_at = last_at
             
-            return Session(
+            session = Session(
                 key=key,
                 messages=messages,
-                created_at=created_at or datetime.now(),
+                created_at=created_at,
+                updated_at=updated_at,
                 metadata=metadata
             )
+            # 文件不以换行结尾（可能有残行）时不登记写入进度，下次保存整体重写
+            if complete:
+                self._persisted[key] = (messages, len(messages), _meta_state(session))
+            return session
         except Exception as e:
             logger.warning(f"加载会话 {key} 失败：{e}")
             return None
     
-    def save(self, session: Session) -> None:
-        """保存会话到磁盘。"""
-        path = self._get_session_path(session.key)
-        
-        with open(path, "w") as f:
-            # 首先写入元数据
-            metadata_line = {
-                "_type": "metadata",
-                "created_at": session.created_at.isoformat(),
-                "updated_at": session.updated_at.isoformat(),
-                "metadata": session.metadata
-            }
-            f.write(json.dumps(metadata_line) + "\n")
-            
-            # 写入消息
-            for msg in session.messages:
-                f.write(json.dumps(msg) + "\n")
+    def save(self, session: Session, durable: bool = False) -> None:
+        """
+        保存会话到磁盘。
+        
+        如果上次保存后只新增了消息，则只把新消息追加到 JSONL 文件；
+        会话被清空或首次保存时才重写整个文件。
         
-        self._cache[session.key] = session
+        参数:
+            session: 要保存的会话。
+            durable: 为 True 时写入后调用 fsync，确保数据落盘。
+        """
+        self.save_many([session], durable=durable)
+    
+    def save_many(self, sessions: list[Session], durable: bool = False) -> None:
+        """
+        批量保存多个会话（例如关闭时统一刷盘）。
+        
+        先序列化所有会话，再集中写入文件，序列化和 I/O 不再交替进行。
+        """
+        # 跳过自上次保存后没有任何变化的会话
+        plans = [(session, plan) for session in sessions if (plan := self._serialize(session))]
+        if not plans:
+            return
+        
+        # 写入后各会话文件的大小，记入索引，供 list_sessions 判断索引条目是否过期
+        sizes: dict[str, int | None] = {}
+        for session, (mode, body, meta, state, count) in plans:
+            path = self._get_session_path(session.key)
+            sizes[session.key] = None
+            if mode == "wb":
+                # 整体重写走临时文件 + 原子替换
+                _atomic_write(path, body, durable)
+                sizes[session.key] = len(body)
+            elif body is not None:
+                # 消息已整体序列化为字节，一次 write 追加
+                with open(path, mode, buffering=65536) as f:
+                    f.write(body)
+                    if durable:
+                        f.flush()
+                        os.fsync(f.fileno())
+                    sizes[session.key] = f.tell()
+            if meta is not None:
+                _atomic_write(self._get_meta_path(session.key), meta, durable)
+            # 只为仍在缓存中的会话记录写入进度，已换出的会话下次加载时会重新建立
+            if session.key in self._cache:
+                self._cache[session.key] = session
+                self._persisted[session.key] = (session.messages, count, state)
+            else:
+                self._persisted.pop(session.key, None)
+        
+        index = self._load_index()
+        changed = False
+        for session, _ in plans:
+            created_at = session.created_at.isoformat()
+            updated_at = session.updated_at.isoformat()
+            size = sizes[session.key]
+            entry = index.get(session.key)
+            if entry is None or entry.get("created_at") != created_at:
+                index[session.key] = {
+                    "key": session.key,
+                    "created_at": created_at,
+                    "updated_at": updated_at,
+                    "path": str(self._get_session_path(session.key)),
+                    "size": size,
+                }
+                changed = True
+            else:
+                changes = {"updated_at": updated_at}
+                if size is not None:
+                    changes["size"] = size
+                entry.update(changes)
+                self._index_pending.setdefault(session.key, {}).update(changes)
+        
+        # 新会话立即写回；只有 updated_at 变化时按 INDEX_FLUSH_INTERVAL 合并写回
+        if changed or (
+            self._index_pending
+            and time.monotonic() - self._index_written_at >= INDEX_FLUSH_INTERVAL
+        ):
+            self._write_index()
+    
+    def _serialize(
+        self, session: Session
+    ) -> tuple[str, bytes | None, bytes | None, bytes, int] | None:
+        """
+        生成会话的写入计划。
+        
+        返回:
+            (文件打开模式, 要写入的消息内容（无需写入时为 None）,
+            元数据文件内容（无需重写时为 None）, 元数据状态, 消息数) 元组；
+            会话自上次保存后没有变化时返回 None。
+        """
+        messages = session.messages
+        saved = self._persisted.get(session.key)
+        if (
+            saved and saved[0] is messages and saved[1] <= len(messages)
+            and self._get_session_path(session.key).exists()
+        ):
+            new_messages = messages[saved[1]:]
+            mode = "ab"
+        else:
+            new_messages = messages
+            mode = "wb"
+        
+        state = _meta_state(session)
+        write_meta = mode == "wb" or state != saved[2]
+        if mode == "ab" and not new_messages and not write_meta:
+            return None
+        meta = _meta_bytes(session) if write_meta else None
+        
+        body = None
+        if new_messages or mode == "wb":
+            body = b"".join([orjson.dumps(msg, option=orjson.OPT_APPEND_NEWLINE) for msg in new_messages])
+        
+        return mode, body, meta, state, len(messages)
+    
+    def append_message(self, key: str, role: str, content: str, **kwargs: Any) -> Session:
+        """
+        向会话添加一条消息并立即追加写入磁盘。
+        
+        参数:
+            key: 会话键。
+            role: 消息角色。
+            content: 消息内容。
+            **kwargs: 消息的其他字段。
+        
+        返回:
+            更新后的会话。
+        """
+        session = self.get_or_create(key)
+        session.add_message(role, content, **kwargs)
+        self.save(session)
+        return session
     
     def delete(self, key: str) -> bool:
         """
@@ -165,8 +566,16 @@ class SessionManager:
         """
         # 从缓存中移除
         self._cache.pop(key, None)
+        self._last_access.pop(key, None)
+        self._persisted.pop(key, None)
+        self._index_pending.pop(key, None)
+        
+        index = self._load_index()
+        if index.pop(key, None) is not None:
+            self._write_index()
         
         # 删除文件
+        self._get_meta_path(key).unlink(missing_ok=True)
         path = self._get_session_path(key)
         if path.exists():
             path.unlink()
@@ -180,23 +589,42 @@ class SessionManager:
         返回:
             会话信息字典列表。
         """
+        index = self._load_index()
         sessions = []
-        
-        for path in self.sessions_dir.glob("*.jsonl"):
+        for key, entry in index.items():
+            # 索引中 updated_at 的更新会延迟写回（其他进程或异常退出时可能来不及写），
+            # 会话文件大小与索引记录不一致时，从文件最后一行重新取 updated_at
             try:
-                # 只读取元数据行
-                with open(path) as f:
-                    first_line = f.readline().strip()
-                    if first_line:
-                        data = json.loads(first_line)
-                        if data.get("_type") == "metadata":
-                            sessions.append({
-                                "key": path.stem.replace("_", ":"),
-                                "created_at": data.get("created_at"),
-                                "updated_at": data.get("updated_at"),
-                                "path": str(path)
-                            })
-            except Exception:
+                st = os.stat(entry["path"])
+            except (OSError, KeyError):
                 continue
+            if st.st_size != entry.get("size"):
+                changes = {
+                    "updated_at": _read_last_timestamp(Path(entry["path"]))
+                    or datetime.fromtimestamp(st.st_mtime).isoformat(),
+                    "size": st.st_size,
+                }
+                entry.update(changes)
+                self._index_pending.setdefault(key, {}).update(changes)
+            sessions.append({
+                "key": entry.get("key", key),
+                "created_at": entry.get("created_at"),
+                "updated_at": entry.get("updated_at"),
+                "path": entry["path"],
+            })
+        return sorted(sessions, key=lambda x: x.get("updated_at") or "", reverse=True)
+    
+    def _scan_sessions(self) -> dict[str, dict[str, Any]]:
+        """扫描会话目录，为每个会话读取元数据，用于重建索引。"""
+        # 一次 scandir 拿到全部文件名，元数据文件是否存在直接查集合，不再逐个 stat
+        with os.scandir(self.sessions_dir) as it:
+            names = {entry.name for entry in it if entry.is_file()}
+        paths = [self.sessions_dir / name for name in names if name.endswith(".jsonl")]
+        if not paths:
+            return {}
         
-        return sorted(sessions, key=lambda x: x.get("updated_at", ""), reverse=True)
+        # 各文件的读取互相独立，用线程池重叠磁盘读取的等待
+        has_meta = [f"{path.stem}.meta.json" in names for path in paths]
+        with ThreadPoolExecutor(max_workers=min(SCAN_WORKERS, len(paths))) as pool:
+            infos = list(pool.map(_read_session_info, paths, has_meta))
+        return {info["key"]: info for info in infos if info}
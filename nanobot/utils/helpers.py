@@ -1,8 +1,12 @@
 """nanobot 的实用工具函数。"""
 
+import functools
 from pathlib import Path
 from datetime import datetime
 
+# 文件名中不安全字符到 "_" 的转换表
+_UNSAFE_FILENAME_CHARS = str.maketrans(dict.fromkeys('<>:"/\\|?*', "_"))
+
 
 def ensure_dir(path: Path) -> Path:
     """确保目录存在，必要时创建它。"""
@@ -10,9 +14,15 @@ def ensure_dir(path: Path) -> Path:
     return path
 
 
+@functools.lru_cache(maxsize=None)
+def _ensure_dir_once(path: Path) -> Path:
+    """同一路径在进程内只创建一次目录，供下面的固定路径辅助函数使用。"""
+    return ensure_dir(path)
+
+
 def get_data_path() -> Path:
     """获取 nanobot 数据目录（~/.nanobot）。"""
-    return ensure_dir(Path.home() / ".nanobot")
+    return _ensure_dir_once(Path.home() / ".nanobot")
 
 
 def get_workspace_path(workspace: str | None = None) -> Path:
@@ -29,12 +39,12 @@ def get_workspace_path(workspace: str | None = None) -> Path:
         path = Path(workspace).expanduser()
     else:
         path = Path.home() / ".nanobot" / "workspace"
-    return ensure_dir(path)
+    return _ensure_dir_once(path)
 
 
 def get_sessions_path() -> Path:
     """获取会话存储目录。"""
-    return ensure_dir(get_data_path() / "sessions")
+    return _ensure_dir_once(get_data_path() / "sessions")
 
 
 def get_memory_path(workspace: Path | None = None) -> Path:
@@ -68,11 +78,8 @@ def truncate_string(s: str, max_len: int = 100, suffix: str = "...") -> str:
 
 def safe_filename(name: str) -> str:
     """将字符串转换为安全的文件名。"""
-    # 替换不安全的字符
-    unsafe = '<>:"/\\|?*'
-    for char in unsafe:
-        name = name.replace(char, "_")
-    return name.strip()
+    # 一次 translate 替换所有不安全的字符
+    return name.translate(_UNSAFE_FILENAME_CHARS).strip()
 
 
 def parse_session_key(key: str) -> tuple[str, str]:
@@ -85,10 +92,8 @@ def parse_session_key(key: str) -> tuple[str, str]:
     返回:
         (频道, 聊天 ID) 元组。
     """
-    parts = key.split(":", 1)
-    if len(parts) == 2:
-        return parts[0], parts[1]
-    return key, ""
+    channel, _, chat_id = key.partition(":")
+    return channel, chat_id
 
 
 def format_duration(seconds: float) -> str:
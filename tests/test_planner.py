@@ -0,0 +1,91 @@
+import json
+from typing import Any
+
+from nanobot.agent.planner import JITPlanner
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.providers.base import LLMProvider, LLMResponse
+
+
+class EchoTool(Tool):
+    concurrency_safe = True
+
+    @property
+    def name(self) -> str:
+        return "echo"
+
+    @property
+    def description(self) -> str:
+        return "echo tool"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {"text": {"type": "string"}},
+            "required": ["text"],
+        }
+
+    async def execute(self, text: str, **kwargs: Any) -> str:
+        return text
+
+
+class PlanProvider(LLMProvider):
+    def __init__(self, content: str) -> None:
+        super().__init__()
+        self.content = content
+        self.calls = 0
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+        self.calls += 1
+        return LLMResponse(content=self.content)
+
+    def get_default_model(self) -> str:
+        return "test"
+
+
+def _registry() -> ToolRegistry:
+    reg = ToolRegistry()
+    reg.register(EchoTool())
+    return reg
+
+
+async def test_plan_levels_follow_dependencies_and_are_cached() -> None:
+    plan = {
+        "steps": [
+            {"tool": "echo", "args": {"text": "a"}, "depends_on": []},
+            {"tool": "echo", "args": {"text": "b"}, "depends_on": [0]},
+            {"tool": "echo", "args": {"text": "c"}, "depends_on": []},
+        ]
+    }
+    provider = PlanProvider("```json\n" + json.dumps(plan) + "\n```")
+    planner = JITPlanner(provider, "test")
+    tools = _registry()
+
+    levels = await planner.plan("task", tools)
+    assert [[s.args["text"] for s in level] for level in levels] == [["a", "c"], ["b"]]
+
+    executed = await planner.execute(levels, tools)
+    assert [result for _, result in executed] == ["a", "c", "b"]
+
+    messages = planner.to_messages(executed)
+    assert messages[0]["role"] == "assistant"
+    assert [m["tool_call_id"] for m in messages[1:]] == ["plan_0", "plan_1", "plan_2"]
+
+    await planner.plan("task", tools)
+    assert provider.calls == 1
+
+
+async def test_invalid_plan_falls_back() -> None:
+    tools = _registry()
+    for content in (
+        "not json",
+        json.dumps({"steps": [{"tool": "missing", "args": {}}]}),
+        json.dumps({"steps": [{"tool": "echo", "args": {}}]}),
+        json.dumps({"steps": [
+            {"tool": "echo", "args": {"text": "a"}, "depends_on": [1]},
+            {"tool": "echo", "args": {"text": "b"}, "depends_on": [0]},
+        ]}),
+    ):
+        planner = JITPlanner(PlanProvider(content), "test")
+        assert await planner.plan("task", tools) is None
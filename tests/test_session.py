@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from nanobot.session.manager import SessionManager
+
+
+@pytest.fixture
+def manager(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> SessionManager:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    return SessionManager(tmp_path / "workspace")
+
+
+def test_save_appends_only_new_messages(manager: SessionManager) -> None:
+    session = manager.get_or_create("telegram:1")
+    session.add_message("user", "hi")
+    manager.save(session)
+    manager.append_message("telegram:1", "assistant", "hello")
+
+    path = manager._get_session_path("telegram:1")
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["content"] for line in lines] == ["hi", "hello"]
+
+    session.clear()
+    session.add_message("user", "fresh")
+    manager.save(session)
+    assert len(path.read_text().splitlines()) == 1
+
+
+def test_reload_restores_messages_and_metadata(manager: SessionManager, tmp_path: Path) -> None:
+    session = manager.get_or_create("cli:direct")
+    session.metadata["lang"] = "zh"
+    session.add_message("user", "hi")
+    session.add_message("assistant", "hello")
+    manager.save(session)
+
+    reloaded = SessionManager(tmp_path / "workspace").get_or_create("cli:direct")
+    assert reloaded.metadata == {"lang": "zh"}
+    assert reloaded.get_history() == [
+        {"role": "user", "content": "hi"},
+        {"role": "assistant", "content": "hello"},
+    ]
+    assert [s["key"] for s in manager.list_sessions()] == ["cli:direct"]
+
+
+def test_load_legacy_metadata_line(manager: SessionManager) -> None:
+    path = manager._get_session_path("cli:old")
+    path.write_text(
+        json.dumps({"_type": "metadata", "created_at": "2024-01-01T00:00:00", "metadata": {"a": 1}}) + "\n"
+        + json.dumps({"role": "user", "content": "old"}) + "\n"
+    )
+
+    session = manager.get_or_create("cli:old")
+    assert session.metadata == {"a": 1}
+    assert session.get_history() == [{"role": "user", "content": "old"}]
+    assert manager.list_sessions()[0]["created_at"] == "2024-01-01T00:00:00"
+
+
+def test_index_rebuild_keeps_original_key(manager: SessionManager) -> None:
+    session = manager.get_or_create("cli:my_chat")
+    session.add_message("user", "hi")
+    manager.save(session)
+    manager._get_index_path().unlink()
+
+    assert [s["key"] for s in manager.list_sessions()] == ["cli:my_chat"]
+
+
+def test_append_does_not_rewrite_index_or_meta(manager: SessionManager) -> None:
+    session = manager.get_or_create("cli:direct")
+    session.add_message("user", "hi")
+    manager.save(session)
+    index_path = manager._get_index_path()
+    meta_path = manager._get_meta_path("cli:direct")
+    before = (index_path.stat().st_mtime_ns, meta_path.stat().st_mtime_ns)
+
+    session.add_message("assistant", "hello")
+    manager.save(session)
+    assert (index_path.stat().st_mtime_ns, meta_path.stat().st_mtime_ns) == before
+    assert manager.list_sessions()[0]["updated_at"] == session.updated_at.isoformat()
+
+
+def test_history_is_a_copy(manager: SessionManager) -> None:
+    session = manager.get_or_create("cli:direct")
+    session.add_message("user", "hi")
+    session.get_history()[0]["content"] = "changed"
+
+    assert session.get_history() == [{"role": "user", "content": "hi"}]
+
+
+def test_list_sessions_sees_unflushed_updates(manager: SessionManager, tmp_path: Path) -> None:
+    session = manager.get_or_create("cli:direct")
+    session.add_message("user", "hi")
+    manager.save(session)
+    session.add_message("assistant", "hello")
+    manager.save(session)
+
+    reopened = SessionManager(tmp_path / "workspace")
+    assert reopened.list_sessions()[0]["updated_at"] == session.updated_at.isoformat()
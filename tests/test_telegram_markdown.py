@@ -0,0 +1,10 @@
+from nanobot.channels.telegram import _markdown_to_telegram_html
+
+
+def test_inline_code_spanning_code_block_keeps_block() -> None:
+    text = "Run the ` command:\n```bash\nls -la\n```\nthen check `out`"
+
+    html = _markdown_to_telegram_html(text)
+
+    assert "\x00" not in html
+    assert "<pre><code>ls -la\n</code></pre>" in html
@@ -86,3 +86,54 @@ async def test_registry_returns_validation_error() -> None:
     reg.register(SampleTool())
     result = await reg.execute("sample", {"query": "hi"})
     assert "Invalid parameters" in result
+
+
+class RecordingTool(Tool):
+    def __init__(self, name: str, safe: bool, log: list[str]) -> None:
+        self._name = name
+        self.concurrency_safe = safe
+        self._log = log
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return "recording tool"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"type": "object", "properties": {"n": {"type": "integer"}}}
+
+    async def execute(self, **kwargs: Any) -> str:
+        import asyncio
+
+        self._log.append(f"start {self._name}{kwargs['n']}")
+        await asyncio.sleep(0.01)
+        self._log.append(f"end {self._name}{kwargs['n']}")
+        return f"{self._name}{kwargs['n']}"
+
+
+async def test_registry_execute_many_preserves_order_and_groups_safe_calls() -> None:
+    log: list[str] = []
+    reg = ToolRegistry()
+    reg.register(RecordingTool("read", True, log))
+    reg.register(RecordingTool("write", False, log))
+    calls = [("read", {"n": 1}), ("read", {"n": 2}), ("write", {"n": 3}), ("read", {"n": 4})]
+
+    results = await reg.execute_many(calls)
+
+    assert results == ["read1", "read2", "write3", "read4"]
+    assert log[:2] == ["start read1", "start read2"]
+    assert log.index("start write3") > log.index("end read2")
+
+
+def test_registry_definitions_cached_until_registry_changes() -> None:
+    reg = ToolRegistry()
+    reg.register(SampleTool())
+    defs = reg.get_definitions()
+    assert reg.get_definitions() is defs
+
+    reg.unregister("sample")
+    assert reg.get_definitions() == []